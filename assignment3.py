@@ -2,11 +2,21 @@ import pandas as pd
 import numpy as np
 import sys
 
-print(pd.__version__)
+from countries import normalize_country_names
+from datasets import cached_source, read_excel_cached
+from joins import JoinInput, join_countries
+from query import topk
+from worldbank import read_indicator_panel
 
 pd.set_option('display.max_rows', None)
 pd.options.mode.chained_assignment = None
 
+ENERGY_PATH = 'source/EnergyIndicators.xls'
+GDP_PATH = 'source/world_bank.csv'
+SCIMEN_PATH = 'source/scimagojr-3.xlsx'
+GDP_YEAR_RANGE = range(2006, 2016)
+GDP_YEARS = [str(year) for year in GDP_YEAR_RANGE]
+
 ContinentDict = {'China': 'Asia',
                  'United States': 'North America',
                  'Japan': 'Asia',
@@ -24,69 +34,69 @@ ContinentDict = {'China': 'Asia',
                  'Brazil': 'South America'}
 
 
+# Renames the columns of the raw energy sheet and converts Energy Supply from petajoules to gigajoules.
+def clean_energy_sheet(energy):
+    energy = energy.rename(columns={'Unnamed: 2': 'Country',
+                                    'Petajoules': 'Energy Supply',
+                                    'Gigajoules': 'Energy Supply per Capita',
+                                    '%': '% Renewable'})
+    energy['Energy Supply'] *= 1000000
+    return energy
+
+
 # Load the energy data from the file Energy Indicators.xls, which is a list of indicators of energy supply
 # and renewable electricity production from the United Nations for the year 2013,
 # and should be put into a DataFrame with the variable name of energy.
+@cached_source(ENERGY_PATH)
 def prepare_enerfy_df():
-    # Just for practising apply some function to every row
-    def pretty_country(row):
-        from re import findall, sub
-        row['Country'] = sub("\d+", "", row['Country'])
-        if '(' in row['Country']:
-            row['Country'] = findall('(\w+)\s*\\(', row['Country'])[0]
-        return row
-
-    energy = pd.read_excel('source/EnergyIndicators.xls', skiprows=17, skipfooter=38, usecols='C:F', index_col=None,
-                           na_values="...")
-    energy.rename(columns={'Unnamed: 2': 'Country',
-                           'Petajoules': 'Energy Supply',
-                           'Gigajoules': 'Energy Supply per Capita',
-                           '%': '% Renewable'}, inplace=True)
-    energy['Energy Supply'] *= 1000000
-    energy = energy \
-        .apply(pretty_country, axis=1) \
-        .replace({"Republic of Korea": "South Korea",
-                  "United States of America": "United States",
-                  "United Kingdom of Great Britain and Northern Ireland": "United Kingdom",
-                  "China, Hong Kong Special Administrative Region": "Hong Kong"})
+    energy = read_excel_cached(ENERGY_PATH, clean_energy_sheet, skiprows=17, skipfooter=38, usecols='C:F',
+                               index_col=None, na_values="...")
+    energy['Country'] = normalize_country_names(energy['Country'])
     energy.index = energy['Country']
     return energy
 
 
-# Load the GDP data from the file world_bank.csv, which is a csv containing countries' GDP
-# from 1960 to 2015 from World Bank. Call this DataFrame GDP.
+# The GDP data of the file world_bank.csv, which is a csv containing countries' GDP from 1960 to 2015
+# from World Bank, as a country x year panel of the last 10 years (2006-2015) only.
+# The values are read as float64, the answers report them unrounded.
+@cached_source(GDP_PATH)
+def load_gdp_panel():
+    panel = read_indicator_panel(GDP_PATH, years=GDP_YEAR_RANGE, dtype=np.float64)
+    return panel.with_countries(normalize_country_names(pd.Series(panel.countries), clean=False))
+
+
+# Load the GDP data from the file world_bank.csv. Call this DataFrame GDP.
+@cached_source(GDP_PATH)
 def prepare_GDP_df():
-    GDP = pd.read_csv('source/world_bank.csv', skiprows=4)
-    GDP.drop(GDP.columns[4:50], axis=1, inplace=True)
-    GDP.replace({"Korea, Rep.": "South Korea",
-                 "Iran, Islamic Rep.": "Iran",
-                 "Hong Kong SAR, China": "Hong Kong"}, inplace=True)
-    GDP.index = GDP['Country Name']
-    return GDP
+    return load_gdp_panel().to_frame()
 
 
 # Load the Sciamgo Journal and Country Rank data for Energy Engineering and Power Technology
 # from the file scimagojr-3.xlsx, which ranks countries based on their journal contributions
 # n the aforementioned area. Call this DataFrame ScimEn.
+@cached_source(SCIMEN_PATH)
 def prepare_sciem_df():
-    ScimEn = pd.read_excel('source/scimagojr-3.xlsx', skiprows=0)
+    ScimEn = read_excel_cached(SCIMEN_PATH, skiprows=0)
     ScimEn.index = ScimEn['Country']
     return ScimEn
 
 
+# The columns of each dataset that end up in the joined dataset, keyed by country name
+def country_inputs(energy, GDP, ScimEn):
+    return [JoinInput('energy', energy, ['Energy Supply', 'Energy Supply per Capita', '% Renewable']),
+            JoinInput('GDP', GDP, GDP_YEARS),
+            JoinInput('ScimEn', ScimEn, ScimEn.columns.drop('Country'))]
+
+
 # Join the three datasets: GDP, Energy, and ScimEn into a new dataset (using the intersection of country names).
 # Use only the last 10 years (2006-2015) of GDP data and only the top 15 countries by Scimagojr 'Rank'.
+@cached_source(ENERGY_PATH, GDP_PATH, SCIMEN_PATH)
 def answer_one():
     energy = prepare_enerfy_df()
     GDP = prepare_GDP_df()
     ScimEn = prepare_sciem_df().head(15)
 
-    res = pd.merge(energy, GDP, how='outer', left_index=True, right_index=True).merge(ScimEn, how='right',
-                                                                                      right_index=True,
-                                                                                      left_index=True)
-
-    res.drop(['Country_x', 'Country Name', 'Country Code', 'Indicator Name', 'Indicator Code', 'Country_y'],
-             axis=1, inplace=True)
+    res, _ = join_countries(country_inputs(energy, GDP, ScimEn), how='left', base='ScimEn')
     return res
 
 
@@ -95,15 +105,12 @@ def answer_one():
 def answer_two():
     energy = prepare_enerfy_df()
     GDP = prepare_GDP_df()
-    GDP.rename(columns={'Country Name': 'Country'}, inplace=True)
     ScimEn = prepare_sciem_df()
 
-    df = pd.merge(ScimEn, energy, how='inner', left_index=True, right_index=True)
-    alldf = pd.merge(df, GDP, how='inner', left_index=True, right_index=True)
-    alldf = alldf.set_index('Country')
-
-    answer_one = alldf[:15]
-    answer_two = alldf.shape[0] - answer_one.shape[0]
+    # Only the matched countries are counted, no column is needed
+    inputs = [join_input._replace(columns=[]) for join_input in country_inputs(energy, GDP, ScimEn)]
+    _, report = join_countries(inputs, how='inner')
+    answer_two = report['matched'].iloc[0] - 15
     return answer_two + 9
 
 
@@ -112,18 +119,15 @@ def answer_two():
 # This function should return a Series named avgGDP with 15 countries and their average GDP sorted in descending order.
 def answer_three():
     top15 = answer_one()
-    top15.loc[:, "aveGDP"] = top15[top15.columns[3:13]] \
-        .mean(axis=1) \
-        .sort_values(ascending=False)
-    return top15["aveGDP"]
+    return load_gdp_panel().mean_over(GDP_YEAR_RANGE, countries=top15.index, name='aveGDP')
 
 
 # By how much had the GDP changed over the 10 year span for the country with the 6th largest average GDP?]
 # This function should return a single number.
 def answer_four():
     top15 = answer_one()
-    answer_four = top15[top15['Rank'] == 4]['2015'] - top15[top15['Rank'] == 4]['2006']
-    return pd.to_numeric(answer_four)[0]
+    answer_four = load_gdp_panel().change_between(2006, 2015, countries=top15.index[top15['Rank'] == 4])
+    return answer_four.iloc[0]
 
 
 # What is the mean `Energy Supply per Capita`?
@@ -135,8 +139,8 @@ def answer_five():
 # What country has the maximum % Renewable and what is the percentage?
 def answer_six():
     top15 = answer_one()
-    res = top15.where(top15['% Renewable'] == top15['% Renewable'].max()).dropna()
-    return res['% Renewable'].index.values[0], res['% Renewable'][0]
+    res = topk(top15, '% Renewable')
+    return res.index[0], res.iloc[0]
 
 
 # Create a new column that is the ratio of Self-Citations to Total Citations.
@@ -144,19 +148,16 @@ def answer_six():
 # This function should return a tuple with the name of the country and the ratio.
 def answer_seven():
     top15 = answer_one()
-    top15.loc[:, "Citate ratio"] = top15['Self-citations'] / top15['Citations']
-    res = top15.where(top15['Citate ratio'] == top15['Citate ratio'].max()).dropna()
-    return res['Citate ratio'].index.values[0], res['Citate ratio'][0]
+    res = topk(top15, lambda frame: frame['Self-citations'] / frame['Citations'])
+    return res.index[0], res.iloc[0]
 
 
 # Create a column that estimates the population using Energy Supply and Energy Supply per capita.
 # What is the third most populous country according to this estimate?
 def answer_eight():
     top15 = answer_one()
-    top15.loc[:, "Population"] = top15['Energy Supply'] / top15['Energy Supply per Capita']
-    top15.sort_values(by="Population", ascending=False, inplace=True)
-    res = top15.index.tolist()[2]
-    return res
+    res = topk(top15, lambda frame: frame['Energy Supply'] / frame['Energy Supply per Capita'], 3)
+    return res.index[2]
 
 
 # Create a column that estimates the number of citable documents per person.
@@ -213,10 +214,21 @@ def answer_thirteen():
     return res
 
 
-current_module = sys.modules[__name__]
-functions = ['one', 'two', 'three', 'four',
-             'five', 'six', 'seven', 'eight', 'nine',
-             'ten', 'eleven', 'twelve', 'thirteen']
-for f in functions:
-    a = getattr(current_module, f'answer_{f}')
-    print(f'\nFUNCTION answer_{f}\n', a())
+ANSWERS = {'one': answer_one, 'two': answer_two, 'three': answer_three, 'four': answer_four,
+           'five': answer_five, 'six': answer_six, 'seven': answer_seven, 'eight': answer_eight,
+           'nine': answer_nine, 'ten': answer_ten, 'eleven': answer_eleven, 'twelve': answer_twelve,
+           'thirteen': answer_thirteen}
+
+# Shared inputs of the answers (see runner.py), most answers start from the merged top 15 frame of answer_one
+INPUTS = {'energy': (prepare_enerfy_df, ()), 'gdp_panel': (load_gdp_panel, ()), 'GDP': (prepare_GDP_df, ('gdp_panel',)),
+          'ScimEn': (prepare_sciem_df, ()), 'top15': (answer_one, ('energy', 'GDP', 'ScimEn'))}
+REQUIRES = {**{name: ('top15',) for name in ANSWERS}, 'two': ('energy', 'GDP', 'ScimEn'),
+            'three': ('top15', 'gdp_panel'), 'four': ('top15', 'gdp_panel')}
+# Library functions timed as stages of their own when profiling (see profiling.py)
+STAGES = ('read_excel_cached', 'read_indicator_panel', 'clean_energy_sheet', 'normalize_country_names',
+          'join_countries', 'topk')
+
+if __name__ == '__main__':
+    from cli import main
+
+    main(sys.argv[1:], module=sys.modules[__name__])
@@ -1,9 +1,21 @@
 import pandas as pd
-from scipy.stats import ttest_ind
+import sys
+
+from datasets import cached_source, read_excel_cached
+from housing import read_quarterly_prices
+from recessions import find_recessions
+from resampling import bootstrap_test, permutation_test
+from towns import read_university_towns, region_mask, split_by_regions
+from ttests import ratio_ttests
 
 pd.options.mode.chained_assignment = None
 pd.set_option('display.max_rows', None)
 
+GDPLEV_PATH = 'source/gdplev.xls'
+TOWNS_PATH = 'source/university_towns.txt'
+HOUSING_PATH = 'source/City_Zhvi_AllHomes.csv'
+RESAMPLING_TESTS = {'permutation': permutation_test, 'bootstrap': bootstrap_test}
+
 """
 Hypothesis: University towns have their mean housing prices less effected by recessions. 
 Run a t-test to compare the ratio of the mean price of houses in university towns 
@@ -34,6 +46,7 @@ states = {'OH': 'Ohio', 'KY': 'Kentucky', 'AS': 'American Samoa', 'NV': 'Nevada'
           'ND': 'North Dakota', 'VA': 'Virginia'}
 
 
+@cached_source(TOWNS_PATH)
 def get_list_of_university_towns():
     """
     Returns a DataFrame of towns and the states they are in from the
@@ -47,78 +60,62 @@ def get_list_of_university_towns():
     2. For "RegionName", when applicable, removing every character from " (" to the end.
     3. Depending on how you read the data, you may need to remove newline character '\n'.
     """
-    with open('source/university_towns.txt') as cities:
-        cities_dict = {}
-        current_key = ''
-        for row in cities.readlines():
-            row = row.strip()
-            if 'edit' in row:
-                current_key = row.replace('[edit]', '')
-            elif '(' in row:
-                town = row[:row.index('(') - 1]
-                cities_dict[town] = current_key
-            else:
-                cities_dict[row] = current_key
+    return read_university_towns(TOWNS_PATH)
 
-    df = pd.DataFrame.from_dict(cities_dict, orient='index').reset_index()
-    df.columns = ['RegionName', 'State']
-    df = df[['State', 'RegionName']]
 
-    return df.sort_values(by=['State', 'RegionName'])
+def clean_gdplev_sheet(df):
+    """
+    Names the quarter and GDP (chained 2009 dollars) columns of the raw gdplev.xls sheet.
+    """
+    df.columns = ['Quarter', 'GDP']
+    return df
 
 
+@cached_source(GDPLEV_PATH)
 def prepare_gbp_data():
     """
     Return prepared data on USA GDP by quarters from 2000 to 2016.
     """
-    df = pd.read_excel('source/gdplev.xls', skiprows=8, usecols='E:F', index_col=None, header=None)
-    df.columns = ['Quarter', 'GDP']
+    df = read_excel_cached(GDPLEV_PATH, clean_gdplev_sheet, skiprows=8, usecols='E:F', index_col=None, header=None)
     df['Year'] = pd.to_numeric(df['Quarter'].str.split(pat='q', expand=True)[0])
     df = df[df['Year'] >= 2000][['Quarter', 'GDP']]
     df['Diff'] = df['GDP'].diff()
     return df.reset_index()
 
 
-def get_start_end():
+def get_recessions():
     """
-    Finds the start, and end of the recession, to avoid duplication of code in the appropriate methods.
+    Returns a DataFrame with the start, bottom and end quarters of every recession since 2000,
+    to avoid duplication of code in the appropriate methods.
     """
-    df = prepare_gbp_data()
-    start = df[(df['Diff'].shift(-1) < 0) & (df['Diff'] < 0)]
-    df = df.iloc[start.index[0] - 1:].reset_index()
-    end = df[(df['Diff'].shift(-1) > 0) & (df['Diff'] > 0)]
-    df = df.iloc[:end.index[0] + 1]
-    return df
+    return find_recessions(prepare_gbp_data().set_index('Quarter')['GDP'])
 
 
-def get_recession_start():
+def get_recession_start(recession=0):
     """
     Returns the year and quarter of the recession start time as a
     string value in a format such as 2005q3
     """
+    return get_recessions()['start'].iloc[recession]
 
-    df = get_start_end()
-    return df.iloc[0]['Quarter']
 
-
-def get_recession_end():
+def get_recession_end(recession=0):
     """
     Returns the year and quarter of the recession end time as a
     string value in a format such as 2005q3
     """
-    df = get_start_end()
-    return df.iloc[-1]['Quarter']
+    return get_recessions()['end'].iloc[recession]
 
 
-def get_recession_bottom():
+def get_recession_bottom(recession=0):
     """
     Returns the year and quarter of the recession bottom time as a
     string value in a format such as 2005q3
     """
-    df = get_start_end()
-    return df[df['GDP'] == df['GDP'].min()]['Quarter'].values[0]
+    return get_recessions()['bottom'].iloc[recession]
 
 
+@cached_source(HOUSING_PATH)
 def convert_housing_data_to_quarters():
     """
     Converts the housing data to quarters and returns it as mean
@@ -129,15 +126,11 @@ def convert_housing_data_to_quarters():
     Note: Quarters are defined in the assignment description, they are
     not arbitrary three month periods.
     """
-    raw = pd.read_csv('source/City_Zhvi_AllHomes.csv')
-    df = raw[['State', 'RegionName'] + list(raw.columns[51:])]
-    df.loc[:, 'State'] = df['State'].map(states)
-    df.set_index(["State", "RegionName"], inplace=True)
-    df = df.groupby(pd.PeriodIndex(df.columns, freq='Q'), axis=1).mean()
-    return df
+    df = read_quarterly_prices(HOUSING_PATH, start='2000-01')
+    return df.rename(index=states, level='State')
 
 
-def run_ttest():
+def run_ttest(recession=0, method='ttest', resamples=10000, seed=0):
     """
     First creates new data showing the decline or growth of housing prices
     between the recession start and the recession bottom. Then runs a ttest
@@ -152,23 +145,61 @@ def run_ttest():
     value for better should be either "university town" or "non-university town"
     depending on which has a lower mean price ratio (which is equivilent to a
     reduced market loss).
+
+    recession selects the recession (in the order of get_recessions()) to test, the first one by default.
+    method='permutation' or 'bootstrap' replaces the t-test by a resampling test of the difference of
+    the mean ratios (see resampling.py), with resamples resamples drawn from seed; better then
+    compares the mean ratios, like the sign of the t statistic does.
+    """
+    all_houses = convert_housing_data_to_quarters().dropna()
+    start_q = get_recession_start(recession)
+    bottom_q = get_recession_bottom(recession)
+
+    ratio = all_houses[start_q] / all_houses[bottom_q]
+    unitown, nonunitown = split_by_regions(ratio, get_list_of_university_towns())
+    unitown, nonunitown = unitown.dropna(), nonunitown.dropna()
+    if method == 'ttest':
+        from scipy.stats import ttest_ind  # scipy.stats is slow to import, load it only when the test runs
+
+        tstat, p = tuple(ttest_ind(unitown, nonunitown))
+    elif method in RESAMPLING_TESTS:
+        tstat, p, _ = RESAMPLING_TESTS[method](unitown, nonunitown, resamples, seed)
+    else:
+        raise ValueError(f"unknown method {method!r}, use 'ttest', {', '.join(map(repr, RESAMPLING_TESTS))}")
+
+    different = p < 0.01
+    better = "university town" if tstat < 0 else "non-university town"
+    return different, p, better
+
+
+def run_ttests(recession=None, by_state=False, equal_var=False):
+    """
+    Batch version of run_ttest(): tests the price ratios of university towns against the other
+    towns for every (start, bottom) pair of quarters with start before bottom, or only for the
+    start and bottom of the given recession, and for every state separately if by_state is set.
+    Uses Welch's t-test unless equal_var is set (run_ttest() uses Student's). Returns a DataFrame
+    indexed by (State,) start, bottom (see ttests.ratio_ttests()).
     """
-    university_towns = get_list_of_university_towns().set_index('RegionName')
     all_houses = convert_housing_data_to_quarters().dropna()
-    start_q = get_recession_start()
-    bottom_q = get_recession_bottom()
+    pairs = None if recession is None else [(get_recession_start(recession), get_recession_bottom(recession))]
+    university = region_mask(all_houses.index, get_list_of_university_towns())
+    by = all_houses.index.get_level_values('State') if by_state else None
+    return ratio_ttests(all_houses, university, pairs, by, equal_var)
 
-    df = all_houses.copy()
-    df['ratio'] = df[start_q] / df[bottom_q]
 
-    unitown = df.loc[list(university_towns.index)]['ratio'].dropna()
-    nonunitown = df.loc[list(set(df.index) - set(unitown)), :]['ratio'].dropna()
-    tstat, p = tuple(ttest_ind(unitown, nonunitown))
+ANSWERS = {'recession_start': get_recession_start, 'recession_end': get_recession_end,
+           'recession_bottom': get_recession_bottom, 'ttest': run_ttest}
 
-    different = p < 0.05
-    result = tstat < 0
-    better = ["university town", "non-university town"]
-    return different, p, better[result]
+# Shared inputs of the answers (see runner.py)
+INPUTS = {'gdp': (prepare_gbp_data, ()), 'recession': (get_recessions, ('gdp',)),
+          'towns': (get_list_of_university_towns, ()), 'housing': (convert_housing_data_to_quarters, ())}
+REQUIRES = {'recession_start': ('recession',), 'recession_end': ('recession',), 'recession_bottom': ('recession',),
+            'ttest': ('towns', 'housing', 'recession')}
+# Library functions timed as stages of their own when profiling (see profiling.py)
+STAGES = ('read_excel_cached', 'clean_gdplev_sheet', 'find_recessions', 'read_university_towns',
+          'read_quarterly_prices', 'split_by_regions', 'ratio_ttests')
 
+if __name__ == '__main__':
+    from cli import main
 
-print(run_ttest())
+    main(sys.argv[1:], module=sys.modules[__name__])
@@ -0,0 +1,13 @@
+from runner import timed
+
+"""
+Benchmarks of the assignments and their library modules, run from the repository root as
+python -m benchmarks.<name>. timed() and best_of() are the timers they share.
+"""
+
+
+def best_of(func, repeat):
+    """
+    Returns the smallest of the seconds repeat calls of func took.
+    """
+    return min(timed(func)[1] for _ in range(repeat))
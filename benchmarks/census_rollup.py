@@ -0,0 +1,48 @@
+import pandas as pd
+
+from benchmarks import timed
+from census import CensusRollup, read_census
+
+"""
+Checks census.CensusRollup against the row-level answers of assignment2 (also after adding
+POPESTIMATE years with update()) and times building it, the state-level queries on it and the
+same queries on the rows of census.csv repeated 1x, 10x and 100x.
+
+Run from the repository root: python -m benchmarks.census_rollup
+"""
+
+SCALES = [1, 10, 100]
+QUERIES = 100
+
+
+def row_queries(census):
+    counties = census[census['SUMLEV'] == 50]
+    years = counties[[f'POPESTIMATE{year}' for year in range(2010, 2016)]]
+    return (counties.groupby('STNAME', observed=True)['COUNTY'].nunique().idxmax(),
+            census.sort_values('CENSUS2010POP', ascending=False).groupby('STNAME', observed=True).head(3)
+            .groupby('STNAME', observed=True)['CENSUS2010POP'].sum().nlargest(3).index.tolist(),
+            counties['CTYNAME'].iloc[(years.max(axis=1) - years.min(axis=1)).to_numpy().argmax()])
+
+
+def rollup_queries(rollup):
+    return rollup.most_counties_state, rollup.top_states_by_top_counties, rollup.largest_swing_county
+
+
+def main():
+    census = read_census()
+    rollup = CensusRollup.from_census(census)
+    assert rollup_queries(rollup) == row_queries(census)
+    partial = CensusRollup.from_census(census.drop(columns=['POPESTIMATE2014', 'POPESTIMATE2015'])).update(census)
+    pd.testing.assert_frame_equal(partial.groups[rollup.groups.columns], rollup.groups)
+
+    print(f'{"rows":>10}{"build, ms":>12}{"rollup queries, ms":>20}{"row queries, ms":>18}')
+    for scale in SCALES:
+        rows = pd.concat([census] * scale, ignore_index=True)
+        rollup, build = timed(lambda: CensusRollup.from_census(rows))
+        _, on_rollup = timed(lambda: [rollup_queries(rollup) for _ in range(QUERIES)])
+        _, on_rows = timed(lambda: [row_queries(rows) for _ in range(QUERIES)])
+        print(f'{len(rows):>10}{build * 1000:>12.1f}{on_rollup * 1000 / QUERIES:>20.2f}{on_rows * 1000 / QUERIES:>18.2f}')
+
+
+if __name__ == '__main__':
+    main()
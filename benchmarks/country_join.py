@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks import timed
+from joins import JoinInput, join_countries
+
+"""
+Times joins.join_countries() against the merge chain of assignment3.answer_one on synthetic
+country-keyed panels of 1k to 1M countries with 56 yearly columns, of which 10 are kept. The join is
+compared with the merge chain in tests/test_joins.py.
+
+Run from the repository root: python -m benchmarks.country_join
+"""
+
+SIZES = [1000, 100000, 1000000]
+YEARS = [str(year) for year in range(1960, 2016)]
+
+
+def make_panels(countries, seed=0):
+    rng = np.random.default_rng(seed)
+    names = pd.Index(np.arange(countries)).map('Country {:07d}'.format)
+
+    def panel(fraction, columns):
+        index = pd.Index(rng.choice(names, int(countries * fraction), replace=False), name='Country')
+        return pd.DataFrame(rng.random((len(index), len(columns))), index=index, columns=columns)
+
+    return panel(0.8, ['Energy Supply', 'Energy Supply per Capita', '% Renewable']), \
+        panel(0.9, YEARS), \
+        panel(0.7, ['Rank', 'Documents', 'Citations'])
+
+
+def merge_chain(energy, GDP, ScimEn):
+    res = pd.merge(energy, GDP, how='outer', left_index=True, right_index=True) \
+        .merge(ScimEn, how='right', left_index=True, right_index=True)
+    return res.drop(columns=YEARS[:-10])
+
+
+def main():
+    print(f'{"countries":>10}{"join_countries, ms":>20}{"merge chain, ms":>18}')
+    for size in SIZES:
+        energy, GDP, ScimEn = make_panels(size)
+        inputs = [JoinInput('energy', energy, energy.columns), JoinInput('GDP', GDP, YEARS[-10:]),
+                  JoinInput('ScimEn', ScimEn, ScimEn.columns)]
+        (joined, report), planned = timed(lambda: join_countries(inputs, how='left', base='ScimEn'))
+        merged, chained = timed(lambda: merge_chain(energy, GDP, ScimEn))
+        print(f'{size:>10}{planned * 1000:>20.1f}{chained * 1000:>18.1f}')
+    print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+import pandas as pd
+
+import datasets
+from benchmarks import best_of
+
+"""
+Compares parsing the Excel sources with pd.read_excel (cold) against loading them from the
+Feather cache written by datasets.read_excel_cached() (warm).
+
+Run from the repository root: python -m benchmarks.excel_cache
+"""
+
+SHEETS = [('source/EnergyIndicators.xls', dict(skiprows=17, skipfooter=38, usecols='C:F', na_values="...")),
+          ('source/gdplev.xls', dict(skiprows=8, usecols='E:F', header=None)),
+          ('source/scimagojr-3.xlsx', dict(skiprows=0))]
+
+
+def main(repeat=5):
+    if datasets.feather is None:
+        print('pyarrow is not installed, the columnar cache is disabled')
+        return
+    print(f'{"source":<30}{"cold, ms":>12}{"warm, ms":>12}{"speedup":>10}')
+    for path, kwargs in SHEETS:
+        if kwargs.get('header', 0) is None:
+            kwargs['names'] = ['Quarter', 'GDP']  # Feather needs string column names
+        cold = best_of(lambda: pd.read_excel(path, **kwargs), repeat)
+        datasets.read_excel_cached(path, **kwargs)
+        warm = best_of(lambda: datasets.read_excel_cached(path, **kwargs), repeat)
+        print(f'{path:<30}{cold * 1000:>12.2f}{warm * 1000:>12.2f}{cold / warm:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
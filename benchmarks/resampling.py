@@ -0,0 +1,27 @@
+import numpy as np
+from scipy import stats
+
+from benchmarks import timed
+from resampling import bootstrap_test, permutation_test
+
+"""
+Times 100k-resample permutation and bootstrap tests on samples the size of the university town
+groups of assignment4 (about 270 and 10000 price ratios). The tests are compared with
+scipy.stats.permutation_test in tests/test_resampling.py.
+
+Run from the repository root: python -m benchmarks.resampling
+"""
+
+
+def main(resamples=100000, workers=1):
+    rng = np.random.default_rng(0)
+    a, b = rng.lognormal(0, 0.3, 270), rng.lognormal(0.02, 0.3, 10000)
+    print(f'{resamples} resamples, groups of {len(a)} and {len(b)}, {workers} workers')
+    for test in (permutation_test, bootstrap_test):
+        result, seconds = timed(lambda: test(a, b, resamples, seed=0, workers=workers))
+        print(f'{test.__name__:<20}p = {result.pvalue:<10.4f}{seconds:>8.2f} s')
+    print(f'{"scipy ttest_ind":<20}p = {stats.ttest_ind(a, b).pvalue:<10.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+from benchmarks import best_of
+
+"""
+Measures the startup cost of the assignments: importing each module, and computing a single answer
+through the command line entry point, compared with a bare `import pandas` baseline.
+Every command runs in a fresh interpreter.
+
+Run from the repository root: python -m benchmarks.startup
+"""
+
+COMMANDS = [('import pandas', ['-c', 'import pandas']),
+            ('import assignment2', ['-c', 'import assignment2']),
+            ('import assignment3', ['-c', 'import assignment3']),
+            ('import assignment4', ['-c', 'import assignment4']),
+            ('assignment2 --answers one', ['-m', 'cli', 'assignment2', '--answers', 'one']),
+            ('assignment3 --answers five', ['-m', 'cli', 'assignment3', '--answers', 'five']),
+            ('assignment4 --answers recession_start', ['-m', 'cli', 'assignment4', '--answers', 'recession_start'])]
+
+
+def run(args):
+    subprocess.run([sys.executable] + args, check=True, stdout=subprocess.DEVNULL)
+
+
+def main(repeat=5):
+    print(f'{"command":<40}{"wall, ms":>10}')
+    for title, args in COMMANDS:
+        print(f'{title:<40}{best_of(lambda: run(args), repeat) * 1000:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import timed
+
+"""
+Benchmark and regression suite of the assignments: runs every answer of assignment2 and
+assignment3, and run_ttest and its helpers of assignment4, on the bundled source files (scale 1)
+and on synthetic sources scaled 10x and 100x by default, and records per function:
+
+- seconds: wall time
+- peak_rss_mb: peak resident memory of the process, and rss_growth_mb: how much the call raised it
+- alloc_peak_mb: peak of the memory allocated during the call, as traced by tracemalloc
+
+Every measurement runs in a fresh interpreter, so the functions start with empty in-memory caches
+(their inputs are loaded as part of the call). Every function is measured twice: cold, with an
+empty on-disk cache (.cache), as after a change of the source files, so parsing and building the
+cached files count; and warm, with the files that the cold run cached. The allocations are measured
+in separate runs, since tracing slows the code down.
+
+The scaled census.csv, world_bank.csv and olympics.csv repeat the bundled rows under renamed
+states/countries (see benchmarks.synthetic). City_Zhvi_AllHomes.csv isn't bundled, so it is always
+synthetic, with ZILLOW_ROWS rows at scale 1. The Excel sources and university_towns.txt are small
+and used as they are.
+
+Run from the repository root:
+
+    python -m benchmarks.suite run --output results.json
+    python -m benchmarks.suite compare baseline.json results.json
+
+Larger scales are opt-in: --scales 1,10,100,1000 also generates a census.csv of about 2 GB and a
+Zillow panel of a million rows, which need several GB of disk and memory.
+
+compare exits with status 1 if any function got slower or used more memory than the threshold allows.
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCALES = [1, 10, 100]
+ZILLOW_ROWS = 1000
+ZILLOW_BLOCK = 50000
+HELPERS = {'assignment4': ['get_list_of_university_towns', 'prepare_gbp_data', 'get_recessions',
+                           'convert_housing_data_to_quarters', 'get_recession_start', 'get_recession_end',
+                           'get_recession_bottom', 'run_ttest', 'run_ttests']}
+MODULES = ['assignment2', 'assignment3', 'assignment4']
+CACHES = ['cold', 'warm']
+# metric: smallest absolute change that counts, below it differences are noise
+METRICS = {'seconds': 0.01, 'peak_rss_mb': 4, 'rss_growth_mb': 4, 'alloc_peak_mb': 1}
+
+
+def list_targets(modules):
+    """
+    Returns the "module.function" names of the benchmarked functions of the modules.
+    """
+    targets = []
+    for name in modules:
+        if name in HELPERS:
+            targets.extend(f'{name}.{function}' for function in HELPERS[name])
+        else:
+            module = importlib.import_module(name)
+            targets.extend(f'{name}.{answer.__name__}' for answer in module.ANSWERS.values())
+    return targets
+
+
+def _write_zillow(path, rows, towns_path):
+    from assignment4 import states
+    from benchmarks.synthetic import make_zillow
+    from towns import read_university_towns
+
+    codes = {name: code for code, name in states.items()}
+    towns = read_university_towns(towns_path)
+    towns = towns.assign(State=towns['State'].astype(object).map(codes)).dropna()
+    for start in range(0, rows, ZILLOW_BLOCK):
+        block = make_zillow(min(ZILLOW_BLOCK, rows - start), seed=start, towns=towns)
+        block['RegionID'] += start
+        block['SizeRank'] += start
+        block.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+
+def prepare_sources(directory, scale):
+    """
+    Writes the source files at the given scale to directory/source.
+    """
+    from benchmarks.synthetic import make_census, make_olympics, make_world_bank
+
+    bundled = os.path.join(ROOT, 'source')
+    target = os.path.join(directory, 'source')
+    os.makedirs(target, exist_ok=True)
+    scaled = {'census.csv': make_census, 'world_bank.csv': make_world_bank, 'olympics.csv': make_olympics}
+    for name in os.listdir(bundled):
+        if scale > 1 and name in scaled:
+            scaled[name](os.path.join(target, name), scale, source=os.path.join(bundled, name))
+        elif name != 'City_Zhvi_AllHomes.csv':
+            shutil.copy(os.path.join(bundled, name), target)
+    _write_zillow(os.path.join(target, 'City_Zhvi_AllHomes.csv'), ZILLOW_ROWS * scale,
+                  os.path.join(target, 'university_towns.txt'))
+
+
+def _peak_rss_mb():
+    # On Linux ru_maxrss carries over the peak of the parent process, VmHWM doesn't
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 2 ** 10
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10  # bytes on macOS, KiB on Linux
+
+
+def _function(directory, target):
+    os.chdir(directory)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    module, function = target.split('.')
+    return getattr(importlib.import_module(module), function)
+
+
+def _measure(directory, target, allocations, cold):
+    function = _function(directory, target)
+    if cold:
+        from datasets import CACHE_DIR
+
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    if allocations:
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return {'alloc_peak_mb': peak / 2 ** 20}
+
+    before = _peak_rss_mb()
+    _, seconds = timed(function)
+    peak = _peak_rss_mb()
+    return {'seconds': seconds, 'peak_rss_mb': peak, 'rss_growth_mb': peak - before}
+
+
+def _describe():
+    import numpy
+    import pandas
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'host': platform.node(), 'python': platform.python_version(),
+            'pandas': pandas.__version__, 'numpy': numpy.__version__, 'commit': commit}
+
+
+def run_suite(scales=SCALES, modules=MODULES, repeat=1, log=print):
+    """
+    Measures every target function of the modules at every scale and returns the report: a dict with
+    the environment (meta) and one result per (scale, cache, target), cache being 'cold' or 'warm'.
+    The best of repeat runs is kept.
+    """
+    targets = list_targets(modules)
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix=f'suite-x{scale}-') as directory:
+            log(f'preparing sources at scale {scale}')
+            prepare_sources(directory, scale)
+            # A new process for every task
+            with context.Pool(1, maxtasksperchild=1) as pool:
+                for target in targets:
+                    # The cold runs leave the cache of the warm ones behind
+                    for cache in CACHES:
+                        cold = cache == 'cold'
+                        result = {'scale': scale, 'cache': cache, 'target': target}
+                        try:
+                            runs = [pool.apply(_measure, (directory, target, False, cold)) for _ in range(repeat)]
+                            result.update({metric: min(run[metric] for run in runs) for metric in runs[0]})
+                            result.update(pool.apply(_measure, (directory, target, True, cold)))
+                        except Exception as error:
+                            result['error'] = f'{type(error).__name__}: {error}'
+                        results.append(result)
+                        log(_format_result(result))
+    return {'meta': {**_describe(), 'scales': list(scales), 'repeat': repeat}, 'results': results}
+
+
+def _key(result):
+    # Reports written before the cold runs were added only have warm results
+    return result['scale'], result.get('cache', 'warm'), result['target']
+
+
+def _format_result(result):
+    scale, cache, target = _key(result)
+    if 'error' in result:
+        return f'x{scale:<6}{cache:<6}{target:<50}{result["error"]}'
+    return (f'x{scale:<6}{cache:<6}{target:<50}{result["seconds"]:>10.3f} s'
+            f'{result["peak_rss_mb"]:>10.1f} MB RSS{result["alloc_peak_mb"]:>10.1f} MB allocated')
+
+
+def compare(baseline, current, threshold=0.25):
+    """
+    Compares two reports of run_suite() and returns the regressions as (scale, cache, target, metric,
+    before, after) tuples: metrics that grew by more than threshold (relative) and by more than the noise
+    floor in METRICS, and functions that fail now but didn't before.
+    """
+    before = {_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        key = _key(result)
+        if key not in before:
+            continue
+        old = before[key]
+        if 'error' in result and 'error' not in old:
+            regressions.append(key + ('error', None, result['error']))
+            continue
+        for metric, floor in METRICS.items():
+            if metric in old and metric in result \
+                    and result[metric] > old[metric] * (1 + threshold) and result[metric] - old[metric] > floor:
+                regressions.append(key + (metric, old[metric], result[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite', description='Benchmark the assignments.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='measure the functions and write the results as JSON')
+    run.add_argument('--scales', type=lambda value: [int(scale) for scale in value.split(',')], default=SCALES,
+                     help='comma-separated input scales (default: {})'.format(','.join(map(str, SCALES))))
+    run.add_argument('--modules', type=lambda value: value.split(','), default=MODULES,
+                     help='comma-separated assignments (default: all)')
+    run.add_argument('--repeat', type=int, default=1, help='runs per function, the best one is kept (default: 1)')
+    run.add_argument('--output', default='benchmark.json', help='JSON file to write (default: benchmark.json)')
+    check = commands.add_parser('compare', help='flag regressions between two JSON results')
+    check.add_argument('baseline')
+    check.add_argument('current')
+    check.add_argument('--threshold', type=float, default=0.25,
+                       help='relative increase that counts as a regression (default: 0.25)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        report = run_suite(args.scales, args.modules, args.repeat)
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=1)
+        return
+
+    with open(args.baseline) as baseline, open(args.current) as current:
+        regressions = compare(json.load(baseline), json.load(current), args.threshold)
+    for scale, cache, target, metric, old, new in regressions:
+        if metric == 'error':
+            print(f'x{scale:<6}{cache:<6}{target:<50}now fails: {new}')
+        else:
+            change = f'{new / old - 1:+.0%}' if old else 'new'
+            print(f'x{scale:<6}{cache:<6}{target:<50}{metric:<15}{old:>10.3f} -> {new:>10.3f} ({change})')
+    print(f'{len(regressions)} regressions')
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
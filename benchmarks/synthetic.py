@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+"""
+Synthetic inputs in the layout of the course data files, for benchmarks at sizes the bundled
+samples don't reach.
+"""
+
+STATE_CODES = ['AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA', 'KS',
+               'KY', 'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY',
+               'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV',
+               'WI', 'WY']
+ZILLOW_MONTHS = pd.period_range('1996-04', '2016-08', freq='M').strftime('%Y-%m')
+
+
+def make_regions(rows, seed=0, places=None):
+    """
+    Returns a DataFrame of rows (State, RegionName) pairs with two-letter state codes. RegionName
+    is drawn from about rows / 10 town names, so names repeat across states like real place names do.
+    """
+    rng = np.random.default_rng(seed)
+    places = max(rows // 10, 1) if places is None else places
+    return pd.DataFrame({'State': np.array(STATE_CODES)[rng.integers(0, len(STATE_CODES), rows)],
+                         'RegionName': pd.Index(rng.integers(0, places, rows)).map('Town {}'.format)})
+
+
+def make_zillow(rows, seed=0, months=ZILLOW_MONTHS, towns=None):
+    """
+    Returns a DataFrame in the layout of City_Zhvi_AllHomes.csv: region columns followed by one
+    column of median home values per month, with about 5% of the values missing. If towns (a
+    DataFrame of State codes and RegionName) is given, about a fifth of the regions are drawn from it.
+    """
+    rng = np.random.default_rng(seed)
+    regions = make_regions(rows, seed)
+    growth = 1 + rng.normal(0.003, 0.01, (rows, len(months)))
+    values = np.round(rng.uniform(5e4, 1e6, (rows, 1)) * np.cumprod(growth, axis=1))
+    values[rng.random(values.shape) < 0.05] = np.nan
+    if towns is not None and len(towns):
+        picked = rng.random(rows) < 0.2
+        drawn = towns[['State', 'RegionName']].to_numpy(dtype=object)[rng.integers(0, len(towns), picked.sum())]
+        regions = regions.astype(object)
+        regions.loc[picked, ['State', 'RegionName']] = drawn
+    frame = pd.DataFrame({'RegionID': np.arange(rows), 'RegionName': regions['RegionName'], 'State': regions['State'],
+                          'Metro': 'Metro', 'CountyName': 'County', 'SizeRank': np.arange(rows)})
+    return pd.concat([frame, pd.DataFrame(values, columns=months)], axis=1)
+
+
+def make_university_towns(path, scale, source='source/university_towns.txt'):
+    """
+    Writes a place list in the format of university_towns.txt with scale copies of the source
+    list; the states of copy k are renamed "<State> k", so town names repeat across states.
+    """
+    with open(source) as lines:
+        lines = [line.rstrip('\n') for line in lines]
+    with open(path, 'w') as output:
+        for copy in range(scale):
+            for line in lines:
+                if line.endswith('[edit]'):
+                    line = f'{line[:-len("[edit]")]} {copy}[edit]'
+                output.write(line + '\n')
+
+
+def make_census(path, scale, source='source/census.csv'):
+    """
+    Writes a file in the format of census.csv with scale copies of the source rows; the states
+    of copy k > 0 are renamed "<STNAME> k", so every copy adds states rather than counties.
+    """
+    census = pd.read_csv(source)
+    copies = [census.assign(STNAME=census['STNAME'] + f' {copy}', STATE=census['STATE'] + 100 * copy)
+              for copy in range(1, scale)]
+    pd.concat([census] + copies, ignore_index=True).to_csv(path, index=False)
+
+
+def make_world_bank(path, scale, source='source/world_bank.csv'):
+    """
+    Writes a file in the format of world_bank.csv (4 preamble lines, then one row per country) with
+    scale copies of the source countries; copy k > 0 is named "<Country Name> k".
+    """
+    with open(source) as lines:
+        preamble = [next(lines) for _ in range(4)]
+    gdp = pd.read_csv(source, skiprows=4)
+    copies = [gdp.assign(**{'Country Name': gdp['Country Name'] + f' {copy}',
+                            'Country Code': gdp['Country Code'] + str(copy)})
+              for copy in range(1, scale)]
+    with open(path, 'w') as output:
+        output.writelines(preamble)
+        pd.concat([gdp] + copies, ignore_index=True).to_csv(output, index=False)
+
+
+def make_olympics(path, scale, source='source/olympics.csv'):
+    """
+    Writes a medal table in the format of olympics.csv with scale copies of the source countries
+    followed by the Totals row; copy k > 0 of "Country (ID)" is named "Country k (ID)".
+    """
+    with open(source) as lines:
+        preamble = next(lines)
+    medals = pd.read_csv(source, skiprows=1, index_col=0)
+    countries = medals.drop('Totals')
+
+    def renamed(name, copy):
+        return name.replace(' (', f' {copy} (', 1) if ' (' in name else f'{name} {copy}'
+
+    copies = [countries.rename(index=lambda name: renamed(name, copy)) for copy in range(1, scale)]
+    with open(path, 'w') as output:
+        output.write(preamble)
+        pd.concat([countries] + copies + [medals.loc[['Totals']]]).to_csv(output)
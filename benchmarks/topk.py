@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks import timed
+from query import topk
+
+"""
+Compares query.topk() with the full-sort idioms it replaces (sort_values + head, and
+sort_values + groupby.head for per-group top-k) on frames of 10k, 1M and 10M rows.
+
+Run from the repository root: python -m benchmarks.topk
+"""
+
+SIZES = [10000, 1000000, 10000000]
+
+
+def main(k=3):
+    print(f'{"rows":>10}{"topk, ms":>12}{"sort, ms":>12}{"group topk, ms":>16}{"group sort, ms":>16}')
+    for size in SIZES:
+        rng = np.random.default_rng(0)
+        frame = pd.DataFrame({'a': rng.random(size), 'b': rng.random(size),
+                              'group': pd.Categorical(rng.integers(0, 50, size))})
+        derived = lambda df: df['a'] / df['b']
+        timings = [timed(lambda: topk(frame, derived, k))[1],
+                   timed(lambda: derived(frame).sort_values(ascending=False).head(k))[1],
+                   timed(lambda: topk(frame, 'a', k, by_group='group'))[1],
+                   timed(lambda: frame.sort_values('a', ascending=False).groupby('group', observed=True).head(k))[1]]
+        print(f'{size:>10}' + ''.join(f'{spent * 1000:>{width}.1f}' for spent, width in zip(timings, [12, 12, 16, 16])))
+
+
+if __name__ == '__main__':
+    main()
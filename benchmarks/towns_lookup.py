@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks import timed
+from benchmarks.synthetic import make_regions
+from towns import region_mask
+
+"""
+Times towns.region_mask() against a Python set of label tuples on a synthetic housing panel of
+1M (State, RegionName) rows with 10k towns to find. The mask is tested in tests/test_towns.py.
+
+Run from the repository root: python -m benchmarks.towns_lookup
+"""
+
+
+def main(rows=1000000, towns=10000):
+    index = pd.MultiIndex.from_frame(make_regions(rows))
+    regions = make_regions(towns, 1, places=rows // 10)
+    mask, mask_time = timed(lambda: region_mask(index, regions))
+    expected = set(regions.itertuples(index=False, name=None))
+    python_mask, set_time = timed(lambda: np.array([label in expected for label in index]))
+    assert np.array_equal(mask, python_mask)
+
+    print(f'{rows} rows, {towns} towns, {mask.sum()} matches')
+    print(f'{"region_mask":<30}{mask_time * 1000:>10.1f} ms')
+    print(f'{"python set of tuples":<30}{set_time * 1000:>10.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+
+import pandas as pd
+
+from benchmarks import timed
+from benchmarks.synthetic import make_university_towns
+from towns import read_university_towns
+
+"""
+Times towns.read_university_towns() on university_towns.txt scaled up 1x, 100x and 1000x,
+against the previous readlines() parser that kept the towns in a dict keyed by town name.
+
+Run from the repository root: python -m benchmarks.towns_parser
+"""
+
+SCALES = [1, 100, 1000]
+
+
+def read_with_dict(path):
+    with open(path) as cities:
+        cities_dict = {}
+        current_key = ''
+        for row in cities.readlines():
+            row = row.strip()
+            if 'edit' in row:
+                current_key = row.replace('[edit]', '')
+            elif '(' in row:
+                cities_dict[row[:row.index('(') - 1]] = current_key
+            else:
+                cities_dict[row] = current_key
+    df = pd.DataFrame.from_dict(cities_dict, orient='index').reset_index()
+    df.columns = ['RegionName', 'State']
+    return df[['State', 'RegionName']].sort_values(by=['State', 'RegionName'])
+
+
+def main():
+    print(f'{"scale":>6}{"parser":>8}{"rows":>10}{"time, ms":>12}{"memory, MB":>12}')
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in SCALES:
+            path = os.path.join(directory, f'university_towns_{scale}.txt')
+            make_university_towns(path, scale)
+            for name, parser in [('dict', read_with_dict), ('stream', read_university_towns)]:
+                df, spent = timed(lambda: parser(path))
+                memory = df.memory_usage(deep=True).sum() / 1e6
+                print(f'{scale:>6}{name:>8}{len(df):>10}{spent * 1000:>12.1f}{memory:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
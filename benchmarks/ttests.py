@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from benchmarks import timed
+from benchmarks.synthetic import make_zillow
+from housing import quarterly_means
+from ttests import ratio_ttests
+
+"""
+Times ttests.ratio_ttests() over all (start, bottom) quarter pairs of a synthetic housing panel,
+overall and per state, against one scipy.stats.ttest_ind call per pair. The tests are compared with
+ttest_ind in tests/test_ttests.py.
+
+Run from the repository root: python -m benchmarks.ttests
+"""
+
+
+def main(rows=10000, seed=0):
+    zillow = make_zillow(rows, seed)
+    months = [column for column in zillow.columns if column >= '2000-01' and column[:1].isdigit()]
+    values, quarters = quarterly_means(zillow[months].to_numpy(), months)
+    prices = pd.DataFrame(values, index=pd.MultiIndex.from_frame(zillow[['State', 'RegionName']]), columns=quarters)
+    prices = prices.dropna()
+    mask = np.random.default_rng(seed).random(len(prices)) < 0.05
+
+    tests, batch = timed(lambda: ratio_ttests(prices, mask))
+    by_state, grouped = timed(lambda: ratio_ttests(prices, mask, by=prices.index.get_level_values('State')))
+
+    def loop():
+        for start, bottom in tests.index:
+            ratio = prices[start] / prices[bottom]
+            stats.ttest_ind(ratio[mask], ratio[~mask], equal_var=False)
+
+    _, looped = timed(loop)
+
+    print(f'{len(prices)} regions, {len(tests)} quarter pairs, {len(by_state)} (state, pair) tests')
+    print(f'{"ratio_ttests, all pairs":<35}{batch * 1000:>10.1f} ms')
+    print(f'{"ratio_ttests, all pairs by state":<35}{grouped * 1000:>10.1f} ms')
+    print(f'{"ttest_ind per pair":<35}{looped * 1000:>10.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import timed
+from benchmarks.synthetic import make_world_bank
+from worldbank import read_indicator_panel
+
+"""
+Checks worldbank.read_indicator_panel() against a full read_csv of world_bank.csv and times the
+full read, the read of the 10 years used by assignment3, and the memory-mapped cache, on copies of
+the bundled file scaled 1x to 1000x.
+
+Run from the repository root: python -m benchmarks.worldbank_panel
+"""
+
+SCALES = [1, 100, 1000]
+YEARS = range(2006, 2016)
+
+
+def main():
+    print(f'{"countries":>10}{"read_csv, ms":>14}{"years, ms":>12}{"cached, ms":>12}{"MB":>8}')
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in SCALES:
+            path = os.path.join(directory, f'world_bank_x{scale}.csv')
+            make_world_bank(path, scale)
+            full, whole = timed(lambda: pd.read_csv(path, skiprows=4))
+            panel, pruned = timed(lambda: read_indicator_panel(path, YEARS, cache_dir=directory))
+            cached, mapped = timed(lambda: read_indicator_panel(path, YEARS, cache_dir=directory))
+            expected = full[[str(year) for year in YEARS]].to_numpy(dtype=np.float32)
+            np.testing.assert_array_equal(panel.values, expected)
+            np.testing.assert_array_equal(cached.values, expected)
+            assert cached.countries.equals(pd.Index(full['Country Name'], dtype=object))
+            print(f'{len(full):>10}{whole * 1000:>14.1f}{pruned * 1000:>12.1f}{mapped * 1000:>12.1f}'
+                  f'{panel.values.nbytes / 2 ** 20:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
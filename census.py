@@ -0,0 +1,338 @@
+import hashlib
+import os
+import pickle
+import re
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from datasets import CACHE_DIR, cache_entry, code_version, notify_cache, read_cache_file, write_cache_file
+from query import topk
+
+"""
+Compact and streaming access to census.csv (US Census Bureau county population estimates).
+
+Only the columns the census answers of assignment2 use are read, with categorical names and
+small integer codes. CensusRollup pre-aggregates the file by (SUMLEV, REGION, STNAME) for state- and
+region-level queries; it is built from chunks of the file (like select_census() selects rows), so
+memory stays bounded by the number of groups and a few compact values per row, not the file size.
+"""
+
+CENSUS_PATH = 'source/census.csv'
+# The POPESTIMATE<year> columns are found in the header of the file, each one is read as int32
+BASE_DTYPES = {'SUMLEV': 'int8',
+               'REGION': 'int8',
+               'COUNTY': 'int16',
+               'STNAME': 'category',
+               'CTYNAME': 'category',
+               'CENSUS2010POP': 'int32'}
+ESTIMATE_RE = re.compile(r'^POPESTIMATE\d{4}$')
+COUNTY_LEVEL = 50
+CHUNK_ROWS = 100000
+
+
+def census_dtypes(path=CENSUS_PATH):
+    """
+    Returns the dtypes of the columns of census.csv used by the answers: BASE_DTYPES and all the
+    POPESTIMATE<year> columns of the file.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    return {**BASE_DTYPES, **{column: 'int32' for column in header if ESTIMATE_RE.match(column)}}
+
+
+def read_census(path=CENSUS_PATH):
+    """
+    Reads the columns of census.csv used by the answers (see census_dtypes()), with compact dtypes.
+    """
+    dtypes = census_dtypes(path)
+    return pd.read_csv(path, usecols=list(dtypes), dtype=dtypes)
+
+
+def read_census_chunks(path=CENSUS_PATH, chunksize=CHUNK_ROWS):
+    """
+    Yields census.csv in chunks of chunksize rows, with the same columns and dtypes as read_census().
+    The chunks keep the row numbers of the file as their index.
+    """
+    dtypes = census_dtypes(path)
+    yield from pd.read_csv(path, usecols=list(dtypes), dtype=dtypes, chunksize=chunksize)
+
+
+def _concat(frames):
+    # Categorical columns of the chunks have different categories, union them instead of falling back to strings
+    frames = list(frames)
+    columns = {column: union_categoricals([frame[column] for frame in frames], sort_categories=True)
+               for column, dtype in frames[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)}
+    joined = pd.concat(frames)
+    for column, values in columns.items():
+        joined[column] = pd.Categorical(values)
+    return joined
+
+
+def select_census(condition, columns, path=CENSUS_PATH, chunksize=CHUNK_ROWS):
+    """
+    Returns the given columns of the rows of census.csv for which condition(chunk) is True, indexed
+    by their row numbers in the file. The file is read chunksize rows at a time, so memory is bounded
+    by the chunk size and the number of matching rows. Categorical columns (STNAME, CTYNAME) are
+    returned as plain strings, as the selection usually has few of their categories.
+    """
+    selected = _concat(chunk.loc[condition(chunk), columns] for chunk in read_census_chunks(path, chunksize))
+    return selected.astype({column: dtype.categories.dtype for column, dtype in selected.dtypes.items()
+                            if isinstance(dtype, pd.CategoricalDtype)})
+
+
+def _estimate_years(columns):
+    return sorted(int(column[len('POPESTIMATE'):]) for column in columns if column.startswith('POPESTIMATE'))
+
+
+def _string_keys(index):
+    # STNAME as strings, which compare across chunks with different categories
+    return index.set_levels(index.levels[2].astype(str), level=2)
+
+
+def _top_rows(candidates, k=3):
+    # The k largest CENSUS2010POP rows of every group of a frame of keys and CENSUS2010POP
+    group_ids = candidates.groupby(CensusRollup.KEYS, sort=False).ngroup().to_numpy()
+    return candidates.loc[topk(candidates, 'CENSUS2010POP', k, by_group=group_ids).index.get_level_values(1)]
+
+
+class CensusRollup:
+    """
+    Census populations pre-aggregated by (SUMLEV, REGION, STNAME), one row of groups per key:
+
+    - ROWS, COUNTIES: number of rows and of distinct COUNTY codes
+    - CENSUS2010POP, POPESTIMATE<year>: population sums
+    - POPCHANGE<year>: change of the POPESTIMATE sum from the year before
+    - POPMIN, POPMAX: smallest and largest POPESTIMATE sum over the years
+    - TOP1, TOP2, TOP3: the three largest CENSUS2010POP values of the rows (NaN if there are fewer rows)
+    - SWING, SWING_COUNTY: the largest change (max - min) of a row's POPESTIMATE values and its CTYNAME
+
+    The rollup is built in one vectorized pass over the census frame; the queries below only look at
+    the groups. leaves keeps each row's group and POPESTIMATE minimum and maximum, so that new
+    POPESTIMATE years can be added with update() without reading the earlier years again.
+    """
+
+    KEYS = ['SUMLEV', 'REGION', 'STNAME']
+
+    def __init__(self, groups, leaves, digests=None):
+        self.groups = groups
+        self.leaves = leaves
+        self.digests = digests or {}
+
+    @property
+    def years(self):
+        return _estimate_years(self.groups.columns)
+
+    def copy(self, deep=True):
+        """
+        Returns a rollup with copies of groups and leaves (see DataFrame.copy()), which update() and
+        the caller can modify without changing this one.
+        """
+        return CensusRollup(self.groups.copy(deep=deep), self.leaves.copy(deep=deep), dict(self.digests))
+
+    @classmethod
+    def from_census(cls, census):
+        return cls.from_chunks([census])
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """
+        Builds the rollup from the chunks of a census frame (e.g. read_census_chunks()), keeping only
+        per-group partial aggregates and the four leaves values of every row between chunks.
+        """
+        sums = counties = top = estimates = None
+        leaves, chunk_keys = [], []
+        for chunk in chunks:
+            if estimates is None:
+                estimates = [f'POPESTIMATE{year}' for year in _estimate_years(chunk.columns)]
+            grouped = chunk.groupby(cls.KEYS, observed=True)
+            group_ids = grouped.ngroup().to_numpy()
+            keys = _string_keys(grouped.size().index)
+
+            part = chunk[['CENSUS2010POP'] + estimates].astype(np.int64).groupby(group_ids).sum().set_axis(keys)
+            part.insert(0, 'ROWS', np.bincount(group_ids, minlength=len(keys)))
+            sums = part if sums is None else pd.concat([sums, part]).groupby(level=cls.KEYS).sum()
+
+            pairs = pd.DataFrame({'GROUP': group_ids, 'COUNTY': chunk['COUNTY'].to_numpy()}).drop_duplicates()
+            pairs = keys.take(pairs['GROUP']).to_frame(index=False).assign(COUNTY=pairs['COUNTY'].to_numpy())
+            counties = pairs if counties is None else pd.concat([counties, pairs]).drop_duplicates()
+
+            largest = topk(chunk, 'CENSUS2010POP', 3, by_group=group_ids)
+            rows = keys.take(largest.index.get_level_values(0)).to_frame(index=False) \
+                .assign(CENSUS2010POP=largest.to_numpy())
+            top = rows if top is None else _top_rows(pd.concat([top, rows], ignore_index=True))
+
+            values = chunk[estimates].to_numpy()
+            leaves.append(pd.DataFrame({'GROUP': group_ids, 'CTYNAME': chunk['CTYNAME'],
+                                        'MIN': values.min(axis=1), 'MAX': values.max(axis=1)}, index=chunk.index))
+            chunk_keys.append(keys)
+
+        groups = sums.sort_index()
+        groups.insert(1, 'COUNTIES', counties.groupby(cls.KEYS).size().reindex(groups.index).to_numpy())
+        top = top.sort_values('CENSUS2010POP', ascending=False, kind='stable')
+        table = top.set_index(cls.KEYS + [top.groupby(cls.KEYS).cumcount()])['CENSUS2010POP'].unstack()
+        table = table.reindex(index=groups.index, columns=range(3))
+        groups[['TOP1', 'TOP2', 'TOP3']] = table.to_numpy(dtype=np.float64)
+
+        # Number the groups of every chunk's leaves like the rows of groups
+        for part, keys in zip(leaves, chunk_keys):
+            part['GROUP'] = groups.index.get_indexer(keys)[part['GROUP'].to_numpy()]
+        rollup = cls(groups, _concat(leaves))
+        rollup._derive()
+        return rollup
+
+    def _derive(self):
+        groups, years = self.groups, self.years
+        for previous, year in zip(years, years[1:]):
+            groups[f'POPCHANGE{year}'] = groups[f'POPESTIMATE{year}'] - groups[f'POPESTIMATE{previous}']
+        sums = groups[[f'POPESTIMATE{year}' for year in years]].to_numpy()
+        groups['POPMIN'] = sums.min(axis=1)
+        groups['POPMAX'] = sums.max(axis=1)
+
+        swing = topk(self.leaves, lambda leaves: leaves['MAX'] - leaves['MIN'], by_group='GROUP')
+        group_ids, rows = swing.index.get_level_values(0), swing.index.get_level_values(1)
+        groups['SWING'] = pd.Series(swing.to_numpy(), index=group_ids).reindex(range(len(groups))).to_numpy()
+        groups['SWING_COUNTY'] = pd.Series(self.leaves.loc[rows, 'CTYNAME'].to_numpy(dtype=object),
+                                           index=group_ids).reindex(range(len(groups))).to_numpy()
+
+    def update(self, census):
+        """
+        Adds the POPESTIMATE years of census that the rollup doesn't have yet. census is a frame or an
+        iterable of its chunks (e.g. read_census_chunks()) with the rows the rollup was built from,
+        labelled by the same row numbers. Returns the rollup.
+        """
+        chunks = [census] if isinstance(census, pd.DataFrame) else census
+        added = None
+        minimum, maximum = self.leaves['MIN'].to_numpy(copy=True), self.leaves['MAX'].to_numpy(copy=True)
+        for chunk in chunks:
+            if added is None:
+                added = [f'POPESTIMATE{year}' for year in _estimate_years(chunk.columns) if year not in self.years]
+                if not added:
+                    return self
+                for column in added:
+                    self.groups[column] = np.int64(0)
+            positions = self.leaves.index.get_indexer(chunk.index)
+            group_ids = self.leaves['GROUP'].to_numpy()[positions]
+            for column in added:
+                self.groups[column] += np.bincount(group_ids, weights=chunk[column].to_numpy(),
+                                                   minlength=len(self.groups)).astype(np.int64)
+            values = chunk[added].to_numpy()
+            minimum[positions] = np.minimum(minimum[positions], values.min(axis=1))
+            maximum[positions] = np.maximum(maximum[positions], values.max(axis=1))
+        if added:
+            self.leaves['MIN'], self.leaves['MAX'] = minimum, maximum
+            self._derive()
+        return self
+
+    def save(self, path):
+        pd.to_pickle({'version': code_version(CensusRollup), 'groups': self.groups, 'leaves': self.leaves,
+                      'digests': self.digests}, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a rollup written by save(). Raises ValueError if it was saved by other code than this.
+        """
+        state = pd.read_pickle(path)
+        if not isinstance(state, dict) or state.get('version') != code_version(CensusRollup):
+            raise ValueError(f'{path} was saved by another version of CensusRollup')
+        return cls(state['groups'], state['leaves'], state['digests'])
+
+    def _level(self, level):
+        return self.groups.xs(level, level='SUMLEV')
+
+    def county_counts(self, by='STNAME'):
+        """
+        Number of counties per state (by='STNAME') or per region (by='REGION').
+        """
+        return self._level(COUNTY_LEVEL)['COUNTIES'].groupby(level=by).sum()
+
+    def population(self, column='CENSUS2010POP', by='STNAME', level=COUNTY_LEVEL):
+        """
+        Sum of a population column (CENSUS2010POP, POPESTIMATE<year>, POPCHANGE<year>, ...)
+        over the rows of one SUMLEV, per state or per region.
+        """
+        return self._level(level)[column].groupby(level=by).sum()
+
+    @property
+    def most_counties_state(self):
+        return self.county_counts().idxmax()
+
+    @property
+    def top_states_by_top_counties(self):
+        tops = self.groups[['TOP1', 'TOP2', 'TOP3']]
+        candidates = pd.DataFrame({'STNAME': np.repeat(tops.index.get_level_values('STNAME'), 3),
+                                   'CENSUS2010POP': tops.to_numpy().ravel()})
+        return topk(candidates, 'CENSUS2010POP', 3, by_group='STNAME') \
+            .groupby(level='STNAME').sum() \
+            .nlargest(3).index.tolist()
+
+    @property
+    def largest_swing_county(self):
+        counties = self._level(COUNTY_LEVEL)
+        return counties['SWING_COUNTY'].iloc[counties['SWING'].to_numpy().argmax()]
+
+
+def _hashed(chunks, digests):
+    # Passes the chunks on, updating the digests of the rows (the BASE_DTYPES columns) and of every
+    # POPESTIMATE column
+    hashes = {}
+    for chunk in chunks:
+        columns = {'rows': list(BASE_DTYPES)}
+        columns.update((column, [column]) for column in chunk.columns if ESTIMATE_RE.match(column))
+        for name, selected in columns.items():
+            values = pd.util.hash_pandas_object(chunk[selected], index=False).to_numpy()
+            hashes.setdefault(name, hashlib.sha256()).update(values.tobytes())
+        yield chunk
+    digests.update((name, digest.hexdigest()) for name, digest in hashes.items())
+
+
+def _read_rollup(entry):
+    try:
+        return read_cache_file(entry, '.pkl', CensusRollup.load)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, KeyError, ValueError):
+        return False, None  # saved by other code or damaged: built again and overwritten
+
+
+def _previous_rollup(entry, years):
+    # The newest rollup saved for earlier contents of the file by the same code, if it has fewer years
+    names = [name for name in os.listdir(entry.directory) if name.startswith(entry.prefix)
+             and name.endswith('.pkl') and not name.startswith(entry.stem)] if os.path.isdir(entry.directory) else []
+    for name in sorted(names, key=lambda name: -os.stat(os.path.join(entry.directory, name)).st_mtime_ns):
+        hit, rollup = _read_rollup(entry._replace(stem=name[:-len('.pkl')]))
+        if hit and set(rollup.years) < set(years):
+            return rollup
+    return None
+
+
+def load_census_rollup(path=CENSUS_PATH, cache_dir=CACHE_DIR, chunksize=CHUNK_ROWS):
+    """
+    Returns the CensusRollup of census.csv, built from chunks of chunksize rows. It is saved in
+    cache_dir under the hash of the file and of the census code, and loaded from there on later
+    calls until one of them changes.
+
+    If the file only gained POPESTIMATE years since a rollup was saved (the same rows and earlier
+    years, as told by the digests of the rollup), that rollup is loaded and update()d with the new
+    years instead of being built again.
+    """
+    entry = cache_entry('rollups', path, (), code_version(CensusRollup), cache_dir)
+    hit, rollup = _read_rollup(entry)
+    if hit:
+        notify_cache(load_census_rollup, True)
+        return rollup
+
+    years = _estimate_years(census_dtypes(path))
+    previous = _previous_rollup(entry, years)
+    rollup = None
+    if previous is not None:
+        digests = {}
+        updated = previous.update(_hashed(read_census_chunks(path, chunksize), digests))
+        if previous.digests and all(digests.get(name) == digest for name, digest in previous.digests.items()):
+            rollup = updated
+    if rollup is None:
+        digests = {}
+        rollup = CensusRollup.from_chunks(_hashed(read_census_chunks(path, chunksize), digests))
+    rollup.digests = digests
+    write_cache_file(entry, '.pkl', rollup.save)
+    notify_cache(load_census_rollup, False)
+    return rollup
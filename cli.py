@@ -0,0 +1,92 @@
+import argparse
+import importlib
+import sys
+
+from runner import run_answers
+
+"""
+Command line entry point that computes selected answers of an assignment, e.g.
+
+    python -m cli assignment3 --answers three,seven
+
+Every assignment module lists its answers in an ANSWERS dict of name -> function.
+"""
+
+MODULES = ['assignment2', 'assignment3', 'assignment4']
+
+
+def select_answers(module, names=None):
+    """
+    Returns the (name, function) pairs of the given answer names of the module, all answers if names is empty.
+    """
+    if not names:
+        return list(module.ANSWERS.items())
+    unknown = [name for name in names if name not in module.ANSWERS]
+    if unknown:
+        raise ValueError('unknown answers {} (choose from {})'.format(', '.join(unknown), ', '.join(module.ANSWERS)))
+    return [(name, module.ANSWERS[name]) for name in names]
+
+
+def _compute(module, answers, workers, processes, incremental):
+    names = [name for name, _ in answers]
+    if incremental:
+        from incremental import run_incremental
+
+        return run_incremental(module, names, workers, processes)
+    return run_answers(module, names, workers, processes) + ([],)
+
+
+def run(module, answers, workers=1, processes=False, timings=False, profile=None, incremental=False):
+    if profile:
+        from profiling import instrument
+
+        with instrument(module, sink=profile):
+            results, inputs, reused = _compute(module, answers, workers, processes, incremental)
+    else:
+        results, inputs, reused = _compute(module, answers, workers, processes, incremental)
+    for (name, answer), result in zip(answers, results):
+        print(f'\nFUNCTION {answer.__name__}\n', result.value)
+    if timings:
+        print('\nWALL TIME, s')
+        for name, seconds in inputs.items():
+            print(f'  input {name:<20}{seconds:>10.3f}')
+        for result in results:
+            if result.name in reused:
+                print(f'  answer {result.name:<19}{"stored":>10}')
+            else:
+                print(f'  answer {result.name:<19}{result.seconds:>10.3f}')
+
+
+def main(argv=None, module=None):
+    """
+    Parses the command line and prints the selected answers. module is given when an assignment
+    is run as a script, otherwise it is the first command line argument.
+    """
+    parser = argparse.ArgumentParser(prog='python -m cli' if module is None else None,
+                                     description='Compute the answers of an assignment.')
+    if module is None:
+        parser.add_argument('module', choices=MODULES, help='assignment to run')
+    parser.add_argument('--answers', type=lambda value: [name for name in value.split(',') if name],
+                        help='comma-separated answer names, e.g. three,seven (default: all)')
+    parser.add_argument('--workers', type=int, default=1, help='number of answers computed in parallel (default: 1)')
+    parser.add_argument('--processes', action='store_true', help='use a process pool instead of threads')
+    parser.add_argument('--timings', action='store_true', help='print the wall time of every answer and input')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='write a record per loader, answer and stage call to FILE as JSON lines (see profiling.py)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='reuse the answers stored by earlier runs whose source files and code are unchanged '
+                             '(see incremental.py)')
+    args = parser.parse_args(argv)
+    if args.profile and args.processes:
+        parser.error('--profile records the stages of this process only, use it without --processes')
+    if module is None:
+        module = importlib.import_module(args.module)
+    try:
+        answers = select_answers(module, args.answers)
+    except ValueError as error:
+        parser.error(str(error))
+    run(module, answers, args.workers, args.processes, args.timings, args.profile, args.incremental)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,47 @@
+import re
+
+import pandas as pd
+
+"""
+Vectorized normalization of country names, shared by the country-keyed sources
+(UN energy indicators, World Bank GDP, Scimago ranks).
+"""
+
+# Maps the names used by the different sources to the ones used in the Scimago ranking
+COUNTRY_ALIASES = {"Republic of Korea": "South Korea",
+                   "United States of America": "United States",
+                   "United Kingdom of Great Britain and Northern Ireland": "United Kingdom",
+                   "China, Hong Kong Special Administrative Region": "Hong Kong",
+                   "Korea, Rep.": "South Korea",
+                   "Iran, Islamic Rep.": "Iran",
+                   "Hong Kong SAR, China": "Hong Kong"}
+
+FOOTNOTE_RE = re.compile(r'\d+')
+PARENTHESIS_RE = re.compile(r'(\w+)\s*\(')
+
+
+def _clean(names):
+    names = names.str.replace(FOOTNOTE_RE, '', regex=True)
+    # "Bolivia (Plurinational State of)" -> "Bolivia": keep the word in front of the parenthesis
+    qualified = names.str.contains('(', regex=False).fillna(False).astype(bool)
+    names[qualified] = names[qualified].str.extract(PARENTHESIS_RE, expand=False)
+    return names
+
+
+def normalize_country_names(names, aliases=COUNTRY_ALIASES, clean=True):
+    """
+    Returns a copy of the Series of country names with footnote numbers and parenthesised
+    qualifiers removed (if clean is set) and aliases replaced by their canonical name.
+    Every distinct name is normalized only once, so long country-keyed columns cost
+    little more than their number of distinct countries.
+    """
+    codes, uniques = pd.factorize(names)
+    uniques = pd.Series(uniques, dtype=object)
+    if clean:
+        uniques = _clean(uniques)
+    if aliases:
+        uniques = uniques.replace(aliases)
+    values = uniques.to_numpy(dtype=object).take(codes)
+    values[codes == -1] = None
+    dtype = 'category' if isinstance(names.dtype, pd.CategoricalDtype) else names.dtype
+    return pd.Series(values, index=names.index, name=names.name).astype(dtype)
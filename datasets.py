@@ -0,0 +1,245 @@
+import contextlib
+import functools
+import hashlib
+import inspect
+import os
+import tempfile
+import threading
+from collections import namedtuple
+
+import pandas as pd
+
+try:
+    from pyarrow import feather
+except ImportError:  # the columnar cache is optional, read_excel_cached() falls back to pd.read_excel
+    feather = None
+
+"""
+Memoized loading of the source datasets.
+
+Loaders decorated with cached_source() are run once per combination of their source files'
+paths and modification times; only the result for the latest modification times is kept. Every
+caller gets its own copy of the cached result, so answers that modify a frame in place
+(sort_values(inplace=True), new columns, ...) can't corrupt the shared copy.
+
+Excel sheets read through read_excel_cached() are additionally stored in CACHE_DIR as
+uncompressed Feather files (requires pyarrow), which are memory-mapped on later runs
+instead of parsing the workbook again.
+
+Files derived from a source file (Feather sheets here, the census rollup, World Bank panels) are
+written with write_cache_file() and read with read_cache_file(), which are safe to use from
+concurrent processes: files are renamed into place once complete, and only the complete files of
+earlier contents of the source are removed.
+"""
+
+CACHE_DIR = '.cache'
+
+_cache = {}
+_key_locks = {}
+_lock = threading.Lock()
+# directory, prefix shared by the files of a source file and options, stem naming the current contents
+CacheEntry = namedtuple('CacheEntry', ['directory', 'prefix', 'stem'])
+_listeners = []
+_PANDAS_MAJOR = int(pd.__version__.split('.')[0])
+
+
+def _source_key(paths):
+    return tuple((path, os.stat(path).st_mtime_ns) for path in paths)
+
+
+def _copy_on_write():
+    if _PANDAS_MAJOR >= 3:
+        return True  # always on, and reading the deprecated option warns
+    try:
+        return pd.options.mode.copy_on_write is True
+    except AttributeError:  # pandas < 1.5 has no copy-on-write mode
+        return False
+
+
+def _handout(value):
+    """
+    Returns a copy of a cached value that the caller is free to modify: frames, and other objects
+    with a copy(deep) method like them (e.g. census.CensusRollup), are copied, tuples item by item.
+    With pandas copy-on-write enabled a shallow copy is enough; otherwise the data is copied.
+    Other values are handed out as they are and must not be modified (e.g. the read-only
+    worldbank.IndicatorPanel).
+    """
+    if isinstance(value, tuple):
+        return tuple(_handout(item) for item in value)
+    if hasattr(value, 'copy'):
+        return value.copy(deep=not _copy_on_write())
+    return value
+
+
+def add_cache_listener(listener):
+    """
+    Registers listener(loader, hit), called after every call of a cached_source() loader (with the
+    decorated loader), of read_excel_cached() (with read_excel_cached) and of the other loaders
+    with a cache of their own that call notify_cache(), hit telling whether the result came from
+    the cache.
+    """
+    _listeners.append(listener)
+
+
+def remove_cache_listener(listener):
+    _listeners.remove(listener)
+
+
+def notify_cache(loader, hit):
+    """
+    Calls the cache listeners for a call of loader, a function with a cache of its own.
+    """
+    for listener in _listeners:
+        listener(loader, hit)
+
+
+def cached_source(*paths):
+    """
+    Decorator for loaders that read the given source files. The result is cached until
+    one of the files is modified (or the cache is invalidated) and handed out as a copy.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper():
+            key = (func.__module__, func.__qualname__, _source_key(paths))
+            with _lock:
+                key_lock = _key_locks.setdefault(key, threading.Lock())
+            # Concurrent callers of the same loader wait for the first one instead of loading the data again
+            with key_lock:
+                with _lock:
+                    hit = key in _cache
+                    if hit:
+                        value = _cache[key]
+                if not hit:
+                    value = func()
+                    with _lock:
+                        _cache[key] = value
+                        # Results for earlier modification times are never asked for again
+                        for stale in [other for other in _key_locks if other[:2] == key[:2] and other != key]:
+                            _cache.pop(stale, None)
+                            del _key_locks[stale]
+            notify_cache(wrapper, hit)
+            return _handout(value)
+
+        wrapper.source_paths = paths
+        return wrapper
+
+    return decorator
+
+
+def invalidate(path=None):
+    """
+    Drops cached results that depend on the given source file, or the whole cache if no path is given.
+    """
+    with _lock:
+        if path is None:
+            _cache.clear()
+            _key_locks.clear()
+            return
+        for key in [key for key in _cache if any(p == path for p, _ in key[2])]:
+            del _cache[key]
+            _key_locks.pop(key, None)
+
+
+def file_digest(path):
+    """
+    Returns the sha256 hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_version(func):
+    """
+    Returns a version of the code that builds a cached file: the name of func (a function or class)
+    and the digest of the source file defining it, so editing func or a helper next to it changes
+    the version. The digest doesn't depend on the module name, which is __main__ for scripts.
+    Wrappers made with functools.wraps (e.g. by profiling.py) have the version of the function they wrap.
+    """
+    func = inspect.unwrap(func)
+    try:
+        source = inspect.getsourcefile(func)
+    except TypeError:  # builtins have no source file
+        source = None
+    return '{}:{}'.format(func.__qualname__, file_digest(source)[:16] if source else '')
+
+
+def cache_entry(kind, path, options, version=None, cache_dir=CACHE_DIR):
+    """
+    Returns the CacheEntry of the files derived from the source file path with the given options
+    (anything with a stable repr, e.g. read arguments) by the given version of the code (see
+    code_version()), stored in cache_dir/kind as "<file name>.<digest of options>.<digest of the
+    file and version><suffix>". Files of earlier contents or code versions share the prefix and are
+    replaced by write_cache_file().
+    """
+    prefix = '{}.{}.'.format(os.path.basename(path), hashlib.sha256(repr(options).encode()).hexdigest()[:12])
+    contents = hashlib.sha256(f'{file_digest(path)}\0{version!r}'.encode()).hexdigest()
+    return CacheEntry(os.path.join(cache_dir, kind), prefix, prefix + contents[:16])
+
+
+def read_cache_file(entry, suffix, read):
+    """
+    Returns (True, read(file)) for the file stem + suffix of the entry, or (False, None) if it
+    doesn't exist, e.g. because another process removed it in the meantime; the caller then builds
+    the data again.
+    """
+    try:
+        return True, read(os.path.join(entry.directory, entry.stem + suffix))
+    except FileNotFoundError:
+        return False, None
+
+
+def write_cache_file(entry, suffix, write):
+    """
+    Writes the file stem + suffix of the entry with write(path) to a temporary file of its own, which
+    is renamed into place once complete, so readers never see a partial file. Then removes the
+    complete files of the other contents of the source or versions of the code; temporary files
+    of other writers are kept.
+    """
+    os.makedirs(entry.directory, exist_ok=True)
+    handle, tmp = tempfile.mkstemp(prefix=entry.stem + suffix + '.', suffix='.tmp', dir=entry.directory)
+    os.close(handle)
+    try:
+        write(tmp)
+        os.replace(tmp, os.path.join(entry.directory, entry.stem + suffix))
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+    for name in os.listdir(entry.directory):
+        if name.startswith(entry.prefix) and not name.startswith(entry.stem) and not name.endswith('.tmp'):
+            with contextlib.suppress(OSError):  # already removed by another writer, or in use (Windows)
+                os.remove(os.path.join(entry.directory, name))
+
+
+def read_excel_cached(path, cleaner=None, **read_kwargs):
+    """
+    Reads an Excel sheet with pd.read_excel(path, **read_kwargs), applies cleaner (renames,
+    unit conversion, ...) and stores the result as a Feather file. Later calls memory-map
+    the Feather file, which is rebuilt only when the hash of the source file or the code of
+    cleaner (see code_version()) changes.
+    The cleaned frame must keep the default RangeIndex and use string column names.
+    """
+    if feather is None:
+        df = pd.read_excel(path, **read_kwargs)
+        notify_cache(read_excel_cached, False)
+        return cleaner(df) if cleaner else df
+
+    version = (cleaner and code_version(cleaner), code_version(read_excel_cached))
+    entry = cache_entry('sheets', path, (sorted(read_kwargs.items()), cleaner and cleaner.__qualname__), version)
+    hit, df = read_cache_file(entry, '.feather',
+                              lambda cached: feather.read_table(cached, memory_map=True).to_pandas(split_blocks=True))
+    if hit:
+        notify_cache(read_excel_cached, True)
+        return df
+
+    df = pd.read_excel(path, **read_kwargs)
+    if cleaner:
+        df = cleaner(df)
+    write_cache_file(entry, '.feather', lambda tmp: feather.write_feather(df, tmp, compression='uncompressed'))
+    notify_cache(read_excel_cached, False)
+    return df
@@ -0,0 +1,57 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+"""
+Quarterly aggregation of the Zillow monthly home value files (City_Zhvi_AllHomes.csv and the
+region files in the same layout): one row per region, one 'YYYY-MM' column per month.
+"""
+
+MONTH_RE = re.compile(r'^\d{4}-\d{2}$')
+
+
+def read_monthly_prices(path, start='2000-01', index_columns=('State', 'RegionName')):
+    """
+    Reads the index columns and the month columns from start onward (as float32) of a Zillow file.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    months = [column for column in header if MONTH_RE.match(column) and column >= start]
+    return pd.read_csv(path, usecols=list(index_columns) + months,
+                       dtype={month: np.float32 for month in months})[list(index_columns) + months]
+
+
+def quarterly_means(values, months):
+    """
+    Averages the monthly values (a rows x months array with the 'YYYY-MM' labels months) into
+    calendar quarters. Missing months and values are ignored, so a trailing partial quarter is
+    the mean of the months it has. Returns the rows x quarters float64 array and the quarters
+    as a PeriodIndex.
+    """
+    months = pd.PeriodIndex(months, freq='M')
+    quarters = pd.period_range(months.min(), months.max(), freq='Q')
+    first = quarters[0].asfreq('M', how='start')
+
+    # Lay the months out on a full (quarter, month of quarter) grid, then zero the missing values
+    grid = np.full((values.shape[0], len(quarters), 3), np.nan, dtype=values.dtype)
+    grid.reshape(values.shape[0], -1)[:, (months.year - first.year) * 12 + months.month - first.month] = values
+    missing = np.isnan(grid)
+    grid[missing] = 0
+
+    sums = np.add(grid[:, :, 0], grid[:, :, 1], dtype=np.float64)
+    sums += grid[:, :, 2]
+    counts = 3 - missing.sum(axis=2, dtype=np.int8)
+    with np.errstate(invalid='ignore', divide='ignore'):  # quarters without any value are NaN
+        means = sums / counts
+    return means, quarters
+
+
+def read_quarterly_prices(path, start='2000-01', index_columns=('State', 'RegionName')):
+    """
+    Reads a Zillow file into a DataFrame of quarterly mean values, indexed by index_columns
+    and with a quarterly PeriodIndex as columns.
+    """
+    monthly = read_monthly_prices(path, start, index_columns)
+    months = monthly.columns[len(index_columns):]
+    means, quarters = quarterly_means(monthly[months].to_numpy(), months)
+    return pd.DataFrame(means, index=pd.MultiIndex.from_frame(monthly[list(index_columns)]), columns=quarters)
@@ -0,0 +1,138 @@
+import glob
+import hashlib
+import os
+import pickle
+
+from datasets import CACHE_DIR, CacheEntry, file_digest, read_cache_file, write_cache_file
+from runner import Result, build_graph, run_answers
+
+"""
+Incremental runs of an assignment: answers are stored in CACHE_DIR/results, keyed by the contents
+of the source files they depend on and of the code, and a later run only recomputes the answers
+whose sources (or the code) changed since they were stored.
+
+The source files of an answer are those of the cached_source() loaders of the inputs it needs
+(INPUTS and REQUIRES, see runner.py) and of the answer itself, e.g. census.csv only feeds answers
+five to eight of assignment2. Any change to a .py file of the repository recomputes everything.
+
+    python -m cli assignment2 --incremental
+"""
+
+
+def answer_sources(module, names=None):
+    """
+    Returns {answer name: sorted paths of the source files it depends on} for the given answers of
+    the module (all by default). Answers that declare no inputs and read no source themselves get
+    no paths.
+    """
+    names = list(module.ANSWERS) if names is None else names
+    inputs = getattr(module, 'INPUTS', {})
+    sources = {}
+    for name in names:
+        paths = set(getattr(module.ANSWERS[name], 'source_paths', ()))
+        for kind, node in build_graph(module, [name]):
+            if kind == 'input':
+                paths.update(getattr(inputs[node][0], 'source_paths', ()))
+        sources[name] = sorted(paths)
+    return sources
+
+
+def code_digest(module):
+    """
+    Returns the sha256 hex digest of the .py files next to the module, i.e. of the assignment and
+    the library modules it uses.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(module.__file__)), '*.py'))):
+        digest.update(os.path.basename(path).encode() + b'\0' + file_digest(path).encode())
+    return digest.hexdigest()
+
+
+class ResultStore:
+    """
+    On-disk store of the answers of a module under cache_dir/results/<module>, one pickle file per
+    answer named after the digest of its sources and of the code. The digests are computed once per
+    store, so create a new store for every run.
+    """
+
+    def __init__(self, module, cache_dir=CACHE_DIR):
+        self.module = module
+        # Named after the file, which is the same when the assignment runs as __main__
+        self.directory = os.path.join(cache_dir, 'results', os.path.splitext(os.path.basename(module.__file__))[0])
+        self.sources = answer_sources(module)
+        self._code = None
+        self._digests = {}
+
+    def _digest(self, path):
+        if path not in self._digests:
+            self._digests[path] = file_digest(path)
+        return self._digests[path]
+
+    def key(self, name):
+        """
+        Returns the digest of the answer's code and source files, None if the answer depends on no
+        known source file (such answers are always recomputed).
+        """
+        if not self.sources[name]:
+            return None
+        if self._code is None:
+            self._code = code_digest(self.module)
+        digest = hashlib.sha256(f'{name}\0{self._code}'.encode())
+        for path in self.sources[name]:
+            digest.update(f'\0{path}\0{self._digest(path)}'.encode())
+        return digest.hexdigest()[:16]
+
+    def _entry(self, name, key):
+        return CacheEntry(self.directory, name + '.', f'{name}.{key}')
+
+    def load(self, name):
+        """
+        Returns (True, stored answer) if the answer is stored for the current sources and code,
+        (False, None) otherwise.
+        """
+        key = self.key(name)
+        if key is None:
+            return False, None
+        try:
+            return read_cache_file(self._entry(name, key), '.pkl', _read_pickle)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None  # a damaged file is recomputed and overwritten
+
+    def save(self, name, value):
+        key = self.key(name)
+        if key is not None:
+            write_cache_file(self._entry(name, key), '.pkl', lambda tmp: _write_pickle(tmp, value))
+
+
+def _read_pickle(path):
+    with open(path, 'rb') as stored:
+        return pickle.load(stored)
+
+
+def _write_pickle(path, value):
+    with open(path, 'wb') as output:
+        pickle.dump(value, output, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def run_incremental(module, names=None, workers=1, processes=False, cache_dir=CACHE_DIR):
+    """
+    Like runner.run_answers(), but serves the answers stored for the current sources and code from
+    the ResultStore and only computes (and stores) the others. Returns the Result tuples in the
+    order of names, the seconds spent building each input, and the names of the stored answers
+    that were reused (their seconds are 0).
+    """
+    names = list(module.ANSWERS) if names is None else list(names)
+    store = ResultStore(module, cache_dir)
+    stored = {}
+    for name in names:
+        hit, value = store.load(name)
+        if hit:
+            stored[name] = value
+    missing = [name for name in names if name not in stored]
+    computed, inputs = run_answers(module, missing, workers, processes) if missing else ([], {})
+    for result in computed:
+        store.save(result.name, result.value)
+
+    results = {name: Result(name, value, 0.0) for name, value in stored.items()}
+    results.update((result.name, result) for result in computed)
+    return [results[name] for name in names], inputs, [name for name in names if name in stored]
@@ -0,0 +1,94 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+"""
+Joins of country-keyed sources (UN energy indicators, World Bank GDP, Scimago ranks), each indexed
+by normalized country names (see countries.py).
+"""
+
+# A source of a join: its name in the report, a frame indexed by country name and the columns to keep
+JoinInput = namedtuple('JoinInput', ['name', 'frame', 'columns'])
+
+
+def country_codes(inputs):
+    """
+    Returns the sorted Index of the distinct country names of all inputs (the categories the joins are
+    keyed on) and, per input name, the codes of its rows in it (-1 for rows without a country name).
+    All names are factorized in one pass.
+    """
+    names = inputs[0].frame.index.append([join_input.frame.index for join_input in inputs[1:]])
+    codes, categories = pd.factorize(names, sort=True)
+    bounds = np.cumsum([0] + [len(join_input.frame) for join_input in inputs])
+    by_input = {}
+    for join_input, start, stop in zip(inputs, bounds, bounds[1:]):
+        input_codes = codes[start:stop]
+        if np.bincount(input_codes[input_codes >= 0], minlength=1).max() > 1:
+            raise ValueError(f'{join_input.name} has more than one row per country')
+        by_input[join_input.name] = input_codes
+    return pd.Index(categories), by_input
+
+
+def plan_join(inputs, base=None):
+    """
+    Returns the names of the inputs in the order they are joined: base first, then by increasing number
+    of rows, so that an inner join shrinks the candidate countries as early as possible.
+    """
+    order = sorted(inputs, key=lambda join_input: (join_input.name != base, len(join_input.frame)))
+    return [join_input.name for join_input in order]
+
+
+def join_countries(inputs, how='inner', base=None):
+    """
+    Joins the inputs (JoinInput) on their country index and returns the joined frame and a report.
+
+    how='inner' keeps the countries found in all inputs and how='outer' those found in any input, both
+    in sorted order; how='left' keeps the countries of the input named base, in its order. The result
+    has the selected columns of every input in the order of inputs, and a categorical index of the
+    country names. Rows without a country name never match.
+
+    Only the selected columns of each input are copied, once, into the result. Matching is done on the
+    integer codes of the country names from country_codes(), not on the names. The report has one
+    row per input, in the order of plan_join(), with its number of countries (keys) and how many of
+    them are in the result (matched) or not (unmatched).
+    """
+    if how not in ('inner', 'outer', 'left'):
+        raise ValueError(f'unknown join type {how!r}')
+    by_name = {join_input.name: join_input for join_input in inputs}
+    if how == 'left' and base not in by_name:
+        raise ValueError(f'no input named {base!r} to left join on')
+
+    categories, codes = country_codes(inputs)
+    order = plan_join(inputs, base)
+
+    if how == 'left':
+        keys = codes[base][codes[base] >= 0]
+    else:
+        present = np.zeros((len(order), len(categories)), dtype=bool)
+        for row, name in enumerate(order):
+            present[row, codes[name][codes[name] >= 0]] = True
+        if how == 'inner':
+            # Each input narrows the countries left by the (smaller) inputs before it
+            candidates = np.flatnonzero(present[0])
+            for row in range(1, len(order)):
+                candidates = candidates[present[row, candidates]]
+            keys = candidates
+        else:
+            keys = np.flatnonzero(present.any(axis=0))
+
+    columns = []
+    for join_input in inputs:
+        valid = codes[join_input.name] >= 0
+        selected = join_input.frame.loc[valid, list(join_input.columns)]
+        columns.append(selected.set_axis(codes[join_input.name][valid]).reindex(keys))
+    index_name = by_name.get(base, inputs[0]).frame.index.name
+    index = pd.CategoricalIndex(pd.Categorical.from_codes(keys, categories=categories), name=index_name)
+    joined = pd.concat(columns, axis=1).set_axis(index)
+
+    in_result = np.zeros(len(categories), dtype=bool)
+    in_result[keys] = True
+    report = pd.DataFrame([(int((codes[name] >= 0).sum()), int(in_result[codes[name][codes[name] >= 0]].sum()))
+                           for name in order], index=pd.Index(order, name='input'), columns=['keys', 'matched'])
+    report['unmatched'] = report['keys'] - report['matched']
+    return joined, report
@@ -0,0 +1,41 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+"""
+Loader of the medal tables derived from the Wikipedia entry on All Time Olympic Games Medals
+(olympics.csv): one row per "Country (ID)", with per-edition participation and medal counts.
+"""
+
+# "01 !.1" -> "Gold.1", "№ Winter" -> "# Winter"
+COLUMN_RE = re.compile(r'^(?:(0[123])..|№)')
+MEDALS = {'01': 'Gold', '02': 'Silver', '03': 'Bronze'}
+# "Afghanistan (AFG)" -> ("Afghanistan", "AFG"), the ID is the first 3 characters after " ("
+COUNTRY_RE = re.compile(r'^(?P<name>.*?)(?:\s\((?P<ID>(?:(?!\s\().){0,3})|$)')
+
+
+def _column_name(column):
+    return COLUMN_RE.sub(lambda match: MEDALS[match.group(1)] if match.group(1) else '#', column, count=1)
+
+
+def read_medal_table(path, count_dtype=np.int32):
+    """
+    Reads a medal table: renames the medal columns to Gold/Silver/Bronze and the participation
+    columns to "#", indexes the rows by country name with the country ID in an ID column, stores
+    the counts as count_dtype and drops the Totals row.
+
+    The count columns are backed by read-only arrays, so the frame can be shared between callers:
+    writing to them raises (or, with copy-on-write, copies the column first).
+    """
+    df = pd.read_csv(path, index_col=0, skiprows=1).drop('Totals')
+    df = df.rename(columns={column: _column_name(column) for column in df.columns})
+
+    countries = df.index.str.extract(COUNTRY_RE)
+    columns = {}
+    for column in df.columns:
+        values = df[column].to_numpy(dtype=count_dtype)
+        values.setflags(write=False)
+        columns[column] = values
+    columns['ID'] = countries['ID'].to_numpy()
+    return pd.DataFrame(columns, index=pd.Index(countries['name'].to_numpy(), name=df.index.name), copy=False)
@@ -0,0 +1,227 @@
+import argparse
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+from datasets import add_cache_listener, remove_cache_listener
+
+"""
+Opt-in per-stage instrumentation of the assignments.
+
+Inside instrument(module), the module's loaders (INPUTS), answers (ANSWERS) and library stages
+(STAGES, e.g. read_excel_cached or join_countries) are replaced by wrappers that emit one record per
+call: the stage and the stages it was called from (path), wall time (seconds, and self_seconds
+without the nested stages), the shapes of the frame arguments and of the result, the memory delta
+and whether the result came from a cache. Nothing is wrapped outside of instrument(), so
+uninstrumented runs cost nothing.
+
+    with instrument(assignment3, sink='profile.jsonl') as profile:
+        assignment3.answer_three()
+
+Records go to a JSON lines file or a callback, and summarize() / folded() turn them into a table
+or into folded stacks for flame graph tools (flamegraph.pl, speedscope):
+
+    python -m cli assignment3 --profile profile.jsonl
+    python -m profiling profile.jsonl [--folded]
+"""
+
+
+def _shape(value):
+    shape = getattr(value, 'shape', None)
+    return list(shape) if isinstance(shape, tuple) else None
+
+
+def _rss_mb():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None  # not available outside Linux
+
+
+class Profile:
+    """
+    The records of an instrumented run, passed on to sink: a callable taking each record or a
+    file-like object the records are written to as JSON lines. Records are emitted when a stage
+    returns, so nested stages come before the stages that called them.
+
+    memory='rss' measures the memory delta of a stage as the change of the resident set size,
+    memory='tracemalloc' as the change of the memory traced by tracemalloc (which is started if
+    it isn't tracing yet, and slows the code down).
+    """
+
+    def __init__(self, sink=None, memory='rss'):
+        if memory not in ('rss', 'tracemalloc'):
+            raise ValueError(f'unknown memory measure {memory!r}')
+        self.records = []
+        self._sink = sink
+        self._memory = memory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def _memory_mb(self):
+        if self._memory == 'tracemalloc':
+            return tracemalloc.get_traced_memory()[0] / 2 ** 20
+        return _rss_mb()
+
+    def _emit(self, record):
+        with self._lock:
+            self.records.append(record)
+            if callable(self._sink):
+                self._sink(record)
+            elif self._sink is not None:
+                self._sink.write(json.dumps(record) + '\n')
+
+    def _on_cache(self, loader, hit):
+        stack = self._stack()
+        if stack and stack[-1][0] is loader:
+            stack[-1][1]['cache'] = 'hit' if hit else 'miss'
+
+    def wrap(self, func):
+        """
+        Returns a wrapper of func that records its calls as a stage named "module.function".
+        """
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = self._stack()
+            record = {'stage': name, 'path': [entry[1]['stage'] for entry in stack] + [name],
+                      'thread': threading.current_thread().name,
+                      'input_shapes': [shape for shape in map(_shape, list(args) + list(kwargs.values())) if shape],
+                      'output_shape': None, 'cache': None}
+            entry = [func, record, 0.0]  # function, record, seconds spent in nested stages
+            stack.append(entry)
+            memory = self._memory_mb()
+            start = time.perf_counter()
+            try:
+                value = func(*args, **kwargs)
+                record['output_shape'] = _shape(value)
+                return value
+            except Exception as error:
+                record['error'] = f'{type(error).__name__}: {error}'
+                raise
+            finally:
+                seconds = time.perf_counter() - start
+                after = self._memory_mb()
+                stack.pop()
+                if stack:
+                    stack[-1][2] += seconds
+                record['seconds'] = seconds
+                record['self_seconds'] = seconds - entry[2]
+                record['memory_delta_mb'] = None if memory is None or after is None else after - memory
+                self._emit(record)
+
+        return wrapper
+
+
+def default_stages(module):
+    """
+    Returns the names of the functions of the module that are instrumented by default: the loaders
+    of its INPUTS, its ANSWERS and the library functions it lists in STAGES.
+    """
+    functions = [loader for loader, _ in getattr(module, 'INPUTS', {}).values()] + list(module.ANSWERS.values())
+    names = [name for name, value in vars(module).items() if callable(value) and value in functions]
+    return names + [name for name in getattr(module, 'STAGES', ()) if name not in names]
+
+
+@contextlib.contextmanager
+def instrument(module, names=None, sink=None, memory='rss'):
+    """
+    Instruments the named functions of the module (default_stages() by default) while the context is
+    active and yields the Profile collecting the records. sink is a callable, a file-like object or
+    the path of a JSON lines file. The functions are looked up in the module's namespace, so imported
+    library functions are instrumented where the module calls them; entries of ANSWERS and INPUTS are
+    replaced too. Use threads, not processes, to run instrumented answers in parallel.
+    """
+    names = default_stages(module) if names is None else names
+    with contextlib.ExitStack() as stack:
+        if isinstance(sink, str):
+            sink = stack.enter_context(open(sink, 'w'))
+        if memory == 'tracemalloc' and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            stack.callback(tracemalloc.stop)
+        profile = Profile(sink, memory)
+
+        originals = {name: getattr(module, name) for name in names}
+        wrappers = {original: profile.wrap(original) for original in originals.values()}
+        answers = dict(module.ANSWERS)
+        inputs = dict(getattr(module, 'INPUTS', {}))
+        for name, original in originals.items():
+            setattr(module, name, wrappers[original])
+        module.ANSWERS.update({name: wrappers.get(answer, answer) for name, answer in answers.items()})
+        if inputs:
+            module.INPUTS.update({name: (wrappers.get(loader, loader), dependencies)
+                                  for name, (loader, dependencies) in inputs.items()})
+        add_cache_listener(profile._on_cache)
+        try:
+            yield profile
+        finally:
+            remove_cache_listener(profile._on_cache)
+            for name, original in originals.items():
+                setattr(module, name, original)
+            module.ANSWERS.update(answers)
+            if inputs:
+                module.INPUTS.update(inputs)
+
+
+def read_records(path):
+    with open(path) as lines:
+        return [json.loads(line) for line in lines if line.strip()]
+
+
+def summarize(records):
+    """
+    Returns one row per stage: (stage, calls, seconds, self seconds, cache hits, cache misses),
+    by decreasing self time. Time spent in a stage nested in itself is counted once.
+    """
+    stages = defaultdict(lambda: [0, 0.0, 0.0, 0, 0])
+    for record in records:
+        row = stages[record['stage']]
+        row[0] += 1
+        if record['stage'] not in record['path'][:-1]:
+            row[1] += record['seconds']
+        row[2] += record['self_seconds']
+        row[3] += record['cache'] == 'hit'
+        row[4] += record['cache'] == 'miss'
+    return sorted(((stage, *row) for stage, row in stages.items()), key=lambda row: -row[3])
+
+
+def folded(records):
+    """
+    Returns the records as folded stacks, "stage;nested stage;... microseconds" lines with the
+    self time of every call path, the input format of flamegraph.pl and speedscope.
+    """
+    paths = defaultdict(float)
+    for record in records:
+        paths[';'.join(record['path'])] += record['self_seconds']
+    return [f'{path} {round(seconds * 1e6)}' for path, seconds in sorted(paths.items())]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m profiling', description='Summarize a profile written by --profile.')
+    parser.add_argument('path', help='JSON lines file of profile records')
+    parser.add_argument('--folded', action='store_true', help='print folded stacks for flame graph tools')
+    args = parser.parse_args(argv)
+    records = read_records(args.path)
+    if args.folded:
+        print('\n'.join(folded(records)))
+        return
+    print(f'{"stage":<50}{"calls":>7}{"total, s":>10}{"self, s":>10}{"hits":>6}{"misses":>8}')
+    for stage, calls, seconds, self_seconds, hits, misses in summarize(records):
+        print(f'{stage:<50}{calls:>7}{seconds:>10.3f}{self_seconds:>10.3f}{hits:>6}{misses:>8}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
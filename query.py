@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+"""
+Top-k queries over derived values of a frame, without sorting it or adding columns to it.
+"""
+
+
+def evaluate(frame, expr):
+    """
+    Evaluates expr on the frame without modifying it: a column label, a callable taking the frame,
+    or a DataFrame.eval() expression string. Returns a Series aligned with the frame.
+    """
+    if callable(expr):
+        values = expr(frame)
+    elif isinstance(expr, str) and expr not in frame.columns:
+        values = frame.eval(expr)
+    else:
+        values = frame[expr]
+    return pd.Series(values, index=frame.index) if not isinstance(values, pd.Series) else values
+
+
+def _largest(values, positions, k):
+    """
+    Positions (a subset of positions) of the k largest values in descending order, equal values
+    in the order of their positions.
+    """
+    if k <= 0:
+        return positions[:0]
+    if k < len(positions):
+        threshold = np.partition(values, len(values) - k)[len(values) - k]
+        greater = values > threshold
+        equal = np.flatnonzero(values == threshold)[:k - greater.sum()]
+        keep = np.concatenate([np.flatnonzero(greater), equal])
+        values, positions = values[keep], positions[keep]
+    return positions[np.lexsort((positions, -values))]
+
+
+def topk(frame, expr, k=1, by_group=None):
+    """
+    Returns the k largest values of expr (see evaluate()) as a Series indexed by the frame's labels,
+    in descending order; ties keep the order of the frame and missing values are skipped.
+
+    With by_group (a column label or an array aligned with the frame) the k largest values of every
+    group are returned, indexed by (group, label) and ordered by group, then by descending value.
+    Selection is done with numpy.partition (per-group maxima with by_group) and only the selected
+    candidates are sorted, instead of sorting the frame.
+    """
+    values = evaluate(frame, expr)
+    ranks = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    positions = np.arange(len(ranks))
+
+    if by_group is None:
+        valid = ~np.isnan(ranks)
+        selected = _largest(ranks[valid], positions[valid], k)
+        return values.iloc[selected]
+
+    groups = frame[by_group] if isinstance(by_group, str) else pd.Series(by_group, index=frame.index)
+    codes, uniques = pd.factorize(groups, sort=True)
+    valid = ~np.isnan(ranks) & (codes >= 0)
+    codes, ranks, positions = codes[valid], ranks[valid], positions[valid]
+
+    # k rounds of per-group maxima give the k-th largest distinct value of every group;
+    # only the rows reaching it are candidates for the top k and need sorting
+    remaining = ranks.copy()
+    for _ in range(max(k, 0)):
+        largest = np.full(len(uniques), -np.inf)
+        np.maximum.at(largest, codes, remaining)
+        remaining[remaining >= largest[codes]] = -np.inf
+    if k > 0:
+        candidates = ranks >= largest[codes]
+        codes, ranks, positions = codes[candidates], ranks[candidates], positions[candidates]
+
+    order = np.lexsort((positions, -ranks, codes))
+    codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    rank_in_group = np.arange(len(codes)) - np.repeat(starts, np.diff(np.r_[starts, len(codes)]))
+    selected = order[rank_in_group < k]
+
+    uniques = pd.Index(uniques)
+    if isinstance(uniques, pd.CategoricalIndex):
+        uniques = uniques.astype(uniques.categories.dtype)
+    index = pd.MultiIndex.from_arrays([uniques.take(codes[rank_in_group < k]), frame.index[positions[selected]]],
+                                      names=[groups.name, frame.index.name])
+    return pd.Series(values.to_numpy()[positions[selected]], index=index, name=values.name)
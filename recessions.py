@@ -0,0 +1,60 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+"""
+Recession detection on a quarterly GDP series.
+
+A recession starts with two consecutive quarters of GDP decline and ends with two consecutive
+quarters of GDP growth; the bottom is the quarter with the lowest GDP in between. Following
+assignment4, the start is reported as the quarter before the first decline and the end as the
+first of the two growth quarters.
+"""
+
+_cache = {}
+
+
+def _series_key(gdp):
+    return hashlib.sha1(pd.util.hash_pandas_object(gdp, index=True).to_numpy().tobytes()).hexdigest()
+
+
+def _detect(gdp):
+    diff = np.diff(gdp.to_numpy(dtype=float), prepend=np.nan)
+    following = np.append(diff[1:], np.nan)
+    declines = np.flatnonzero((diff < 0) & (following < 0))
+    growths = (diff > 0) & (following > 0)
+
+    # First two-quarter growth at or after every position (len(gdp) if there is none)
+    positions = np.arange(len(gdp))
+    next_growth = np.minimum.accumulate(np.where(growths, positions, len(gdp))[::-1])[::-1]
+
+    # Declines followed by the same growth belong to one recession, the first of them starts it.
+    # Recessions that haven't ended yet are left out.
+    ends = next_growth[declines]
+    first = np.ones(len(ends), dtype=bool)
+    first[1:] = ends[1:] != ends[:-1]
+    first &= ends < len(gdp)
+    starts, ends = declines[first] - 1, ends[first]
+    quarters = gdp.index
+    if not len(starts):
+        return pd.DataFrame({'start': quarters[:0], 'bottom': quarters[:0], 'end': quarters[:0]})
+
+    # Number every quarter with the recession it belongs to (-1 outside of recessions) to find the bottoms
+    recession = np.searchsorted(starts, positions, side='right') - 1
+    inside = (recession >= 0) & (positions <= ends[np.maximum(recession, 0)])
+    bottoms = pd.Series(gdp.to_numpy()[inside]).groupby(recession[inside]).idxmin().to_numpy()
+    bottoms = positions[inside][bottoms]
+    return pd.DataFrame({'start': quarters[starts], 'bottom': quarters[bottoms], 'end': quarters[ends]})
+
+
+def find_recessions(gdp):
+    """
+    Returns a DataFrame with the start, bottom and end quarters (index labels of gdp) of every
+    recession in the quarterly GDP series, in chronological order. The result is cached for
+    the series, so repeated calls with the same data don't scan it again.
+    """
+    key = _series_key(gdp)
+    if key not in _cache:
+        _cache[key] = _detect(gdp)
+    return _cache[key].copy()
@@ -0,0 +1,122 @@
+import functools
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+"""
+Non-parametric two-sample tests of the difference of means (permutation and bootstrap), for data
+too skewed for a t-test, e.g. the housing price ratios of assignment4.
+
+The resamples of a block are drawn as one index matrix (one row per resample) and the group means
+are computed with batched reductions over its rows. The two-sided p-value is twice the smaller
+one-sided one, as in scipy.stats.permutation_test. Blocks hold about BLOCK_ELEMENTS indices, which
+bounds the memory use, and every block has its own random generator spawned from the seed, so the
+result only depends on the seed, not on how the blocks are spread over processes.
+"""
+
+BLOCK_ELEMENTS = 1 << 22
+ALTERNATIVES = ('two-sided', 'less', 'greater')
+
+# statistic: difference of the means (a - b); pvalue: share of resamples at least as extreme
+ResamplingResult = namedtuple('ResamplingResult', ['statistic', 'pvalue', 'resamples'])
+
+
+def _subsets(rng, n, k, count):
+    """
+    Returns a (count, k) matrix whose rows are uniformly random k-subsets of range(n), in sorted order.
+    Indices are drawn with replacement and the repeated ones drawn again until every row is distinct,
+    so a block costs O(count * k log k) instead of shuffling count rows of n indices.
+    """
+    drawn = np.sort(rng.integers(0, n, (count, k)), axis=1)
+    repeated = np.zeros(drawn.shape, dtype=bool)
+    while True:
+        np.equal(drawn[:, 1:], drawn[:, :-1], out=repeated[:, 1:])
+        redraw = repeated.sum()
+        if not redraw:
+            return drawn
+        drawn[repeated] = rng.integers(0, n, redraw)
+        drawn.sort(axis=1)
+
+
+def _permutation_block(pooled, size, count, seed):
+    # The smaller group is drawn, the other one is the rest of the pooled values
+    rng = np.random.default_rng(seed)
+    small = min(size, len(pooled) - size)
+    sums = pooled[_subsets(rng, len(pooled), small, count)].sum(axis=1)
+    rest = pooled.sum() - sums
+    if small == size:
+        return sums / size - rest / (len(pooled) - size)
+    return rest / size - sums / small
+
+
+def _bootstrap_block(a, b, count, seed):
+    rng = np.random.default_rng(seed)
+    return a[rng.integers(0, len(a), (count, len(a)))].mean(axis=1) \
+        - b[rng.integers(0, len(b), (count, len(b)))].mean(axis=1)
+
+
+def _run_blocks(block, elements, resamples, seed, workers, block_size):
+    count = block_size or max(1, BLOCK_ELEMENTS // max(elements, 1))
+    sizes = [min(count, resamples - start) for start in range(0, resamples, count)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return np.concatenate(list(pool.map(block, sizes, seeds)))
+    return np.concatenate([block(size, block_seed) for size, block_seed in zip(sizes, seeds)])
+
+
+def _pvalue(statistic, resampled, alternative):
+    # The observed samples count as one of the resamples, so the p-value is never 0. Resamples
+    # whose means differ from the observed ones only by rounding count as ties, as in scipy.
+    tolerance = abs(statistic) * np.finfo(np.float64).eps * 100
+    less = ((resampled <= statistic + tolerance).sum() + 1) / (len(resampled) + 1)
+    greater = ((resampled >= statistic - tolerance).sum() + 1) / (len(resampled) + 1)
+    if alternative == 'two-sided':
+        return min(1.0, 2 * min(less, greater))  # the resampled statistics needn't be symmetric
+    return less if alternative == 'less' else greater
+
+
+def _samples(a, b, alternative, resamples):
+    if alternative not in ALTERNATIVES:
+        raise ValueError(f'alternative must be one of {", ".join(ALTERNATIVES)}')
+    if resamples < 1:
+        raise ValueError(f'resamples must be at least 1, got {resamples}')
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    if a.ndim != 1 or b.ndim != 1 or not len(a) or not len(b):
+        raise ValueError('both samples must be non-empty 1-dimensional arrays')
+    return a, b
+
+
+def permutation_test(a, b, resamples=10000, seed=None, alternative='two-sided', workers=1, block_size=None):
+    """
+    Tests whether the samples a and b come from the same distribution, with the difference of their
+    means as the statistic: the p-value is the share of random relabelings of the pooled values
+    whose difference is at least as extreme as the observed one.
+
+    The resamples are computed in blocks of block_size (by default about BLOCK_ELEMENTS indices per
+    block) on workers processes. Returns a ResamplingResult.
+    """
+    a, b = _samples(a, b, alternative, resamples)
+    pooled = np.concatenate([a, b])
+    statistic = a.mean() - b.mean()
+    block = functools.partial(_permutation_block, pooled, len(a))
+    resampled = _run_blocks(block, min(len(a), len(b)), resamples, seed, workers, block_size)
+    return ResamplingResult(statistic, _pvalue(statistic, resampled, alternative), resamples)
+
+
+def bootstrap_test(a, b, resamples=10000, seed=None, alternative='two-sided', workers=1, block_size=None):
+    """
+    Tests whether the samples a and b have the same mean: both samples are shifted to the mean of
+    the pooled values, and the p-value is the share of bootstrap resamples (drawn with replacement
+    within each sample) whose difference of means is at least as extreme as the observed one.
+    Unlike the permutation test it doesn't assume equal distributions, only equal means.
+
+    Blocks, workers and the result are as in permutation_test().
+    """
+    a, b = _samples(a, b, alternative, resamples)
+    statistic = a.mean() - b.mean()
+    pooled_mean = np.concatenate([a, b]).mean()
+    block = functools.partial(_bootstrap_block, a - a.mean() + pooled_mean, b - b.mean() + pooled_mean)
+    resampled = _run_blocks(block, len(a) + len(b), resamples, seed, workers, block_size)
+    return ResamplingResult(statistic, _pvalue(statistic, resampled, alternative), resamples)
@@ -0,0 +1,88 @@
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from graphlib import TopologicalSorter
+
+"""
+Dependency-aware, parallel computation of the answers of an assignment.
+
+Besides ANSWERS, every assignment module describes the shared inputs of its answers:
+
+    INPUTS = {name: (loader, names of the inputs the loader is built from)}
+    REQUIRES = {answer name: names of the inputs the answer reads}
+
+The loaders are memoized (datasets.cached_source), so building each input once before the
+answers that need it lets all of them share it. Inputs and answers are scheduled as a DAG:
+every node is submitted to the pool as soon as the nodes it depends on are done.
+"""
+
+Result = namedtuple('Result', ['name', 'value', 'seconds'])
+
+
+def timed(func):
+    """
+    Returns func() and the seconds it took.
+    """
+    start = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - start
+
+
+def build_graph(module, names):
+    """
+    Returns the DAG {node: dependencies} of the given answers and the inputs they need,
+    where nodes are ('input', name) or ('answer', name) tuples.
+    """
+    inputs = getattr(module, 'INPUTS', {})
+    requires = getattr(module, 'REQUIRES', {})
+    graph = {}
+    pending = []
+    for name in names:
+        graph[('answer', name)] = {('input', dependency) for dependency in requires.get(name, ())}
+        pending.extend(requires.get(name, ()))
+    while pending:
+        name = pending.pop()
+        if ('input', name) not in graph:
+            graph[('input', name)] = {('input', dependency) for dependency in inputs[name][1]}
+            pending.extend(inputs[name][1])
+    return graph
+
+
+def run_answers(module, names=None, workers=1, processes=False):
+    """
+    Computes the given answers of the module (all of them by default) with a pool of workers
+    threads, or processes if processes is set. Returns Result(name, value, seconds) tuples in
+    the order of names, and a dict with the seconds spent building each shared input.
+
+    Processes don't share memory, so with processes only the answers go to the pool and every
+    worker builds the inputs it needs at most once; threads share the inputs built in the DAG.
+    """
+    names = list(module.ANSWERS) if names is None else list(names)
+    functions = {('answer', name): module.ANSWERS[name] for name in names}
+    graph = build_graph(module, names)
+    for node in graph:
+        if node[0] == 'input':
+            functions[node] = module.INPUTS[node[1]][0]
+    if processes:
+        graph = {node: set() for node in graph if node[0] == 'answer'}
+
+    results, seconds = {}, {}
+    executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor(max_workers=workers) as pool:
+        sorter = TopologicalSorter(graph)
+        sorter.prepare()
+        running = {}
+        while sorter.is_active():
+            for node in sorter.get_ready():
+                running[pool.submit(timed, functions[node])] = node
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                value, seconds[node] = future.result()
+                if node[0] == 'answer':
+                    results[node[1]] = value
+                sorter.done(node)
+
+    answers = [Result(name, results[name], seconds[('answer', name)]) for name in names]
+    inputs = {node[1]: spent for node, spent in seconds.items() if node[0] == 'input'}
+    return answers, inputs
@@ -0,0 +1,147 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+import assignment2
+import census as census_module
+from benchmarks.census_rollup import rollup_queries, row_queries
+from census import CENSUS_PATH, CensusRollup, load_census_rollup, read_census, read_census_chunks, select_census
+from datasets import cache_entry, code_version
+
+
+@pytest.fixture(scope='module')
+def census():
+    return read_census()
+
+
+def washington_growth(census):
+    return census['REGION'].isin([1, 2]) & census['CTYNAME'].str.startswith('Washington') \
+        & (census['POPESTIMATE2015'] > census['POPESTIMATE2014'])
+
+
+def washington_rows(census):
+    return census.loc[washington_growth(census), ['STNAME', 'CTYNAME']].astype(str)
+
+
+@pytest.mark.parametrize('chunksize', [100, 1000, 100000])
+def test_rollup_from_chunks_matches_the_rows(census, chunksize):
+    rollup = CensusRollup.from_chunks(read_census_chunks(chunksize=chunksize))
+    assert rollup_queries(rollup) == row_queries(census)
+    whole = CensusRollup.from_census(census)
+    pd.testing.assert_frame_equal(rollup.groups, whole.groups)
+    pd.testing.assert_frame_equal(rollup.leaves, whole.leaves, check_categorical=False)
+
+
+def test_rollup_groups_match_the_rows(census):
+    groups = CensusRollup.from_census(census).groups
+    expected = census.groupby(CensusRollup.KEYS, observed=True)[['CENSUS2010POP', 'POPESTIMATE2015']].sum()
+    assert groups['CENSUS2010POP'].tolist() == expected['CENSUS2010POP'].tolist()
+    assert groups['POPESTIMATE2015'].tolist() == expected['POPESTIMATE2015'].tolist()
+    assert groups['ROWS'].sum() == len(census)
+
+
+@pytest.mark.parametrize('chunksize', [100, 100000])
+def test_update_from_chunks_adds_the_years(census, chunksize):
+    full = CensusRollup.from_census(census)
+    partial = CensusRollup.from_census(census.drop(columns=['POPESTIMATE2014', 'POPESTIMATE2015']))
+    partial.update(read_census_chunks(chunksize=chunksize))
+    assert partial.years == full.years
+    pd.testing.assert_frame_equal(partial.groups[full.groups.columns], full.groups)
+    assert rollup_queries(partial) == rollup_queries(full)
+
+
+@pytest.mark.parametrize('chunksize', [100, 100000])
+def test_select_census_matches_the_rows(census, chunksize):
+    selected = select_census(washington_growth, ['STNAME', 'CTYNAME'], chunksize=chunksize)
+    pd.testing.assert_frame_equal(selected, washington_rows(census))
+
+
+def test_census_answers_match_the_rows(census):
+    assert (assignment2.answer_five(), assignment2.answer_six(), assignment2.answer_seven()) == row_queries(census)
+    pd.testing.assert_frame_equal(assignment2.answer_eight(), washington_rows(census))
+    assert len(assignment2.answer_eight()) == 5
+
+
+def write_census(path, drop=(), add_2016=False):
+    census = pd.read_csv(CENSUS_PATH).drop(columns=list(drop))
+    if add_2016:
+        census['POPESTIMATE2016'] = census['POPESTIMATE2015'] + census['NPOPCHG_2015']
+    census.to_csv(path, index=False)
+    return census
+
+
+def test_new_estimate_years_are_read(tmp_path):
+    path = tmp_path / 'census.csv'
+    written = write_census(path, add_2016=True)
+    census = read_census(path)
+    assert census['POPESTIMATE2016'].tolist() == written['POPESTIMATE2016'].tolist()
+    assert CensusRollup.from_chunks(read_census_chunks(path, 500)).years == list(range(2010, 2017))
+
+
+def test_load_census_rollup_updates_a_rollup_with_fewer_years(tmp_path, monkeypatch):
+    path = tmp_path / 'census.csv'
+    write_census(path)
+    load_census_rollup(path, cache_dir=tmp_path, chunksize=500)
+
+    write_census(path, add_2016=True)
+    monkeypatch.setattr(CensusRollup, 'from_chunks', None)  # must not be rebuilt
+    rollup = load_census_rollup(path, cache_dir=tmp_path, chunksize=700)
+    monkeypatch.undo()
+    expected = CensusRollup.from_census(read_census(path))
+    pd.testing.assert_frame_equal(rollup.groups[expected.groups.columns], expected.groups)
+    assert rollup.digests == load_census_rollup(path, cache_dir=tmp_path / 'other').digests
+    assert len(os.listdir(tmp_path / 'rollups')) == 1
+
+
+def test_load_census_rollup_rebuilds_when_earlier_years_changed(tmp_path):
+    path = tmp_path / 'census.csv'
+    written = write_census(path)
+    load_census_rollup(path, cache_dir=tmp_path)
+
+    written['POPESTIMATE2012'] += 1
+    written['POPESTIMATE2016'] = written['POPESTIMATE2015']
+    written.to_csv(path, index=False)
+    rollup = load_census_rollup(path, cache_dir=tmp_path)
+    pd.testing.assert_frame_equal(rollup.groups, CensusRollup.from_census(read_census(path)).groups)
+
+
+def test_load_census_rollup_rebuilds_a_rollup_of_other_code(tmp_path, monkeypatch):
+    path = tmp_path / 'census.csv'
+    write_census(path)
+    monkeypatch.setattr(census_module, 'code_version', lambda func: 'CensusRollup:older')
+    load_census_rollup(path, cache_dir=tmp_path)
+    monkeypatch.undo()
+
+    write_census(path, add_2016=True)
+    monkeypatch.setattr(CensusRollup, 'update', None)  # must be rebuilt
+    rollup = load_census_rollup(path, cache_dir=tmp_path)
+    monkeypatch.undo()
+    pd.testing.assert_frame_equal(rollup.groups, CensusRollup.from_census(read_census(path)).groups)
+
+
+@pytest.mark.parametrize('stored', [{'groups': None}, b'damaged'])
+def test_load_census_rollup_rebuilds_an_unreadable_rollup(tmp_path, stored):
+    path = tmp_path / 'census.csv'
+    write_census(path)
+    entry = cache_entry('rollups', path, (), code_version(CensusRollup), tmp_path)
+    os.makedirs(entry.directory)
+    cached = os.path.join(entry.directory, entry.stem + '.pkl')
+    if isinstance(stored, bytes):
+        with open(cached, 'wb') as output:
+            output.write(stored)
+    else:
+        pd.to_pickle(stored, cached)
+    rollup = load_census_rollup(path, cache_dir=tmp_path)
+    assert rollup_queries(rollup) == rollup_queries(CensusRollup.from_census(read_census(path)))
+    assert CensusRollup.load(cached).digests == rollup.digests
+
+
+def test_load_census_rollup_from_concurrent_processes(tmp_path):
+    path = tmp_path / 'census.csv'
+    write_census(path)
+    with ProcessPoolExecutor(4) as pool:
+        rollups = list(pool.map(load_census_rollup, [path] * 8, [tmp_path] * 8))
+    assert all(rollup.largest_swing_county == 'Harris County' for rollup in rollups)
+    assert len(os.listdir(tmp_path / 'rollups')) == 1
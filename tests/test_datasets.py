@@ -0,0 +1,38 @@
+import os
+
+import pandas as pd
+
+import assignment2
+import datasets
+from census import CENSUS_PATH, read_census
+from datasets import cached_source
+
+
+def test_handed_out_rollup_can_be_modified():
+    expected = assignment2.load_rollup().groups.copy()
+    rollup = assignment2.load_rollup()
+    rollup.groups['CENSUS2010POP'] = 0
+    rollup.leaves['MAX'] = 0
+    assignment2.load_rollup().update(read_census(CENSUS_PATH).assign(POPESTIMATE2016=0))
+    pd.testing.assert_frame_equal(assignment2.load_rollup().groups, expected)
+    assert assignment2.load_rollup().leaves['MAX'].gt(0).all()
+
+
+def test_cached_source_keeps_the_latest_modification_only(tmp_path):
+    path = str(tmp_path / 'values.csv')
+    pd.DataFrame({'value': [1]}).to_csv(path, index=False)
+
+    @cached_source(path)
+    def load():
+        return pd.read_csv(path)
+
+    def cached_keys():
+        return [key for key in datasets._cache if key[1] == load.__qualname__]
+
+    assert load()['value'].tolist() == [1]
+    for value in range(2, 5):
+        pd.DataFrame({'value': [value]}).to_csv(path, index=False)
+        os.utime(path, ns=(value * 10 ** 9, value * 10 ** 9))
+        assert load()['value'].tolist() == [value]
+        assert len(cached_keys()) == 1
+    assert len([key for key in datasets._key_locks if key[1] == load.__qualname__]) == 1
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from housing import quarterly_means, read_quarterly_prices
+
+
+def expected_means(values, months):
+    # Quarter of every month column, then the mean of the present values of each quarter
+    frame = pd.DataFrame(values, columns=pd.PeriodIndex(months, freq='M').asfreq('Q'))
+    return frame.T.groupby(level=0).mean().T
+
+
+def assert_matches_groupby(values, months):
+    means, quarters = quarterly_means(values, months)
+    expected = expected_means(values, months).reindex(columns=quarters)
+    assert means.dtype == np.float64
+    np.testing.assert_allclose(means, expected.to_numpy(dtype=np.float64), rtol=1e-6)
+    return means, quarters
+
+
+def test_trailing_partial_quarter():
+    months = ['2016-01', '2016-02', '2016-03', '2016-04', '2016-05', '2016-06', '2016-07', '2016-08']
+    values = np.array([[1, 2, 3, 4, 5, 6, 7, 10], [1, 2, 3, 4, 5, 6, np.nan, 10]], dtype=np.float32)
+    means, quarters = assert_matches_groupby(values, months)
+    assert quarters.astype(str).tolist() == ['2016Q1', '2016Q2', '2016Q3']
+    assert means[:, 2].tolist() == [8.5, 10.0]
+
+
+def test_leading_partial_quarter_and_unsorted_months():
+    months = ['2000-03', '2000-05', '2000-02', '2000-04', '2000-06']
+    values = np.array([[3, 5, 2, 4, 6]], dtype=np.float32)
+    means, quarters = assert_matches_groupby(values, months)
+    assert quarters.astype(str).tolist() == ['2000Q1', '2000Q2'] and means.tolist() == [[2.5, 5.0]]
+
+
+def test_missing_quarters_and_values_are_nan():
+    months = ['2000-01', '2000-02', '2000-07', '2000-08']  # no month of 2000Q2
+    values = np.array([[1, 2, 7, 8], [np.nan, np.nan, 7, np.nan]])
+    means, quarters = assert_matches_groupby(values, months)
+    assert quarters.astype(str).tolist() == ['2000Q1', '2000Q2', '2000Q3']
+    assert np.isnan(means[:, 1]).all() and np.isnan(means[1, 0]) and means[1, 2] == 7
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_random_panels_match_groupby(seed):
+    rng = np.random.default_rng(seed)
+    months = pd.period_range('1999-11', '2016-08', freq='M')
+    months = months[rng.random(len(months)) < 0.9].astype(str)
+    values = rng.uniform(5e4, 1e6, (50, len(months))).astype(np.float32)
+    values[rng.random(values.shape) < 0.2] = np.nan
+    assert_matches_groupby(values, months)
+
+
+def test_read_quarterly_prices(tmp_path):
+    path = tmp_path / 'zillow.csv'
+    pd.DataFrame({'RegionID': [1, 2], 'RegionName': ['Ann Arbor', 'Athens'], 'State': ['MI', 'OH'],
+                  '1999-12': [9.0, 9.0], '2000-01': [1.0, 4.0], '2000-02': [3.0, np.nan],
+                  '2000-04': [5.0, 6.0]}).to_csv(path, index=False)
+    prices = read_quarterly_prices(path)
+    assert prices.index.tolist() == [('MI', 'Ann Arbor'), ('OH', 'Athens')]
+    assert prices.columns.astype(str).tolist() == ['2000Q1', '2000Q2']
+    assert prices.to_numpy().tolist() == [[2.0, 5.0], [4.0, 6.0]]
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.country_join import YEARS, make_panels, merge_chain
+from joins import JoinInput, join_countries, plan_join
+
+
+def inputs(energy, GDP, ScimEn):
+    return [JoinInput('energy', energy, energy.columns), JoinInput('GDP', GDP, YEARS[-10:]),
+            JoinInput('ScimEn', ScimEn, ScimEn.columns)]
+
+
+def plain(joined):
+    return joined.set_axis(joined.index.astype(str))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_left_join_matches_the_merge_chain(seed):
+    energy, GDP, ScimEn = make_panels(200, seed)
+    joined, report = join_countries(inputs(energy, GDP, ScimEn), how='left', base='ScimEn')
+    pd.testing.assert_frame_equal(plain(joined), merge_chain(energy, GDP, ScimEn))
+    assert report.index.tolist() == plan_join(inputs(energy, GDP, ScimEn), 'ScimEn') == ['ScimEn', 'energy', 'GDP']
+    assert report.loc['ScimEn'].tolist() == [len(ScimEn), len(ScimEn), 0]
+    assert report.loc['GDP', 'matched'] == len(GDP.index.intersection(ScimEn.index))
+
+
+@pytest.mark.parametrize('how', ['inner', 'outer'])
+def test_inner_and_outer_joins_match_concat(how):
+    energy, GDP, ScimEn = make_panels(200, 7)
+    joined, report = join_countries(inputs(energy, GDP, ScimEn), how=how)
+    expected = pd.concat([energy, GDP[YEARS[-10:]], ScimEn], axis=1, join=how).sort_index()
+    pd.testing.assert_frame_equal(plain(joined), expected)
+    assert (report['matched'] + report['unmatched'] == report['keys']).all()
+    assert report.index.tolist() == ['ScimEn', 'energy', 'GDP']  # smallest first
+
+
+def test_rows_without_a_country_never_match():
+    a = pd.DataFrame({'x': [1, 2, 3]}, index=pd.Index(['Chad', np.nan, 'Peru'], name='Country'))
+    b = pd.DataFrame({'y': [4, 5]}, index=pd.Index([np.nan, 'Peru'], name='Country'))
+    joined, report = join_countries([JoinInput('a', a, ['x']), JoinInput('b', b, ['y'])], how='outer')
+    assert joined.index.tolist() == ['Chad', 'Peru']
+    assert joined['y'].tolist()[1] == 5 and np.isnan(joined['y'].tolist()[0])
+    assert report.loc['b'].tolist() == [1, 1, 0]
+
+
+def test_join_errors():
+    a = pd.DataFrame({'x': [1, 2]}, index=pd.Index(['Chad', 'Chad'], name='Country'))
+    b = pd.DataFrame({'y': [3]}, index=pd.Index(['Chad'], name='Country'))
+    with pytest.raises(ValueError, match='more than one row per country'):
+        join_countries([JoinInput('a', a, ['x']), JoinInput('b', b, ['y'])])
+    with pytest.raises(ValueError, match='unknown join type'):
+        join_countries([JoinInput('b', b, ['y'])], how='right')
+    with pytest.raises(ValueError, match='no input named'):
+        join_countries([JoinInput('b', b, ['y'])], how='left', base='a')
@@ -0,0 +1,33 @@
+import pytest
+
+import assignment3
+import assignment4
+import datasets
+from profiling import instrument
+
+
+def sheet_cache_hits(call):
+    hits = []
+
+    def listener(loader, hit):
+        if loader is datasets.read_excel_cached:
+            hits.append(hit)
+
+    datasets.invalidate()
+    datasets.add_cache_listener(listener)
+    try:
+        call()
+    finally:
+        datasets.remove_cache_listener(listener)
+    return hits
+
+
+@pytest.mark.parametrize('module, loader', [(assignment3, 'prepare_enerfy_df'), (assignment4, 'prepare_gbp_data')])
+def test_profiled_run_hits_a_warm_sheet_cache(module, loader):
+    sheet_cache_hits(lambda: getattr(module, loader)())  # warms the cache
+    records = []
+    with instrument(module, sink=records.append):
+        assert sheet_cache_hits(lambda: getattr(module, loader)()) == [True]
+    assert [record['cache'] for record in records if record['stage'] == 'datasets.read_excel_cached'] == ['hit']
+    # ... and leaves it warm for the next normal run
+    assert sheet_cache_hits(lambda: getattr(module, loader)()) == [True]
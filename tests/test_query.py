@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from query import evaluate, topk
+
+
+def make_frame(seed, rows=60):
+    # Small integers, so that ties are common, with missing values and missing groups
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, 8, rows).astype(float)
+    a[rng.random(rows) < 0.1] = np.nan
+    group = rng.choice(np.array(['x', 'y', 'z', None], dtype=object), rows, p=[0.4, 0.3, 0.2, 0.1])
+    return pd.DataFrame({'a': a, 'b': rng.integers(1, 4, rows), 'group': group},
+                        index=pd.Index([f'r{i}' for i in range(rows)], name='row'))
+
+
+def expected_topk(values, k, groups=None):
+    # Sorts the rows by group, then by descending value, ties in the order of the frame
+    keyed = groups is not None
+    groups = list(groups) if keyed else [''] * len(values)
+    rows = [(group, -value, position, label) for position, (label, value, group)
+            in enumerate(zip(values.index, values, groups)) if not pd.isna(value) and not pd.isna(group)]
+    taken, counts = [], {}
+    for group, value, _, label in sorted(rows):
+        counts[group] = counts.get(group, 0) + 1
+        if counts[group] <= k:
+            taken.append(((group, label) if keyed else label, -value))
+    return taken
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('k', [0, 1, 3, 100])
+def test_topk_matches_a_full_sort(seed, k):
+    frame = make_frame(seed)
+    assert list(topk(frame, 'a', k).items()) == expected_topk(frame['a'], k)
+    # ... which is sort_values with a stable sort
+    assert topk(frame, 'a', k).equals(frame['a'].dropna().sort_values(ascending=False, kind='stable').head(k))
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('k', [0, 1, 3, 100])
+def test_topk_by_group_matches_a_full_sort(seed, k):
+    frame = make_frame(seed)
+    result = topk(frame, 'a', k, by_group='group')
+    assert list(result.items()) == expected_topk(frame['a'], k, frame['group'])
+    assert result.index.names == ['group', 'row']
+
+    categorical = topk(frame.astype({'group': 'category'}), 'a', k, by_group='group')
+    assert list(categorical.items()) == list(result.items())
+
+
+def test_topk_of_derived_values():
+    frame = make_frame(0)
+    expected = expected_topk(frame['a'] / frame['b'], 5)
+    assert list(topk(frame, 'a / b', 5).items()) == expected
+    assert list(topk(frame, lambda df: df['a'] / df['b'], 5).items()) == expected
+    assert frame.columns.tolist() == ['a', 'b', 'group']
+
+
+def test_topk_by_group_array():
+    frame = make_frame(1)
+    groups = np.where(frame['b'].to_numpy() > 1, 'high', 'low')
+    assert list(topk(frame, 'a', 2, by_group=groups).items()) == expected_topk(frame['a'], 2, groups)
+
+
+def test_topk_all_missing():
+    frame = pd.DataFrame({'a': [np.nan, np.nan], 'group': ['x', 'y']})
+    assert topk(frame, 'a', 2).empty
+    assert topk(frame, 'a', 2, by_group='group').empty
+
+
+def test_evaluate_doesnt_modify_the_frame():
+    frame = make_frame(2)
+    assert evaluate(frame, 'a * 2').equals(frame['a'] * 2)
+    assert frame.columns.tolist() == ['a', 'b', 'group']
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recessions import find_recessions
+
+
+def quarterly(values):
+    return pd.Series(values, index=[f'{2000 + i // 4}q{i % 4 + 1}' for i in range(len(values))], dtype=float)
+
+
+def sequential_recessions(gdp):
+    # The scan assignment4 used before find_recessions(), repeated after the end of every recession
+    values = gdp.to_numpy()
+    diff = np.diff(values, prepend=np.nan)
+    recessions, position = [], 1
+    while True:
+        decline = next((i for i in range(position, len(values) - 1) if diff[i] < 0 and diff[i + 1] < 0), None)
+        if decline is None:
+            break
+        end = next((i for i in range(decline, len(values) - 1) if diff[i] > 0 and diff[i + 1] > 0), None)
+        if end is None:
+            break
+        start = decline - 1
+        recessions.append((gdp.index[start], gdp.index[start + values[start:end + 1].argmin()], gdp.index[end]))
+        position = end + 1
+    return recessions
+
+
+def as_tuples(recessions):
+    assert recessions.columns.tolist() == ['start', 'bottom', 'end']
+    return list(recessions.itertuples(index=False, name=None))
+
+
+def test_find_recessions_matches_the_sequential_scan():
+    rng = np.random.default_rng(0)
+    for _ in range(3000):
+        # Small integer steps, so that flat quarters and equal bottoms are common
+        gdp = quarterly(100 + rng.integers(-2, 3, rng.integers(0, 40)).cumsum())
+        assert as_tuples(find_recessions(gdp)) == sequential_recessions(gdp)
+
+
+def test_recession_that_has_not_ended():
+    gdp = quarterly([5, 4, 3, 4, 5, 6, 5, 4, 3, 4])
+    assert as_tuples(find_recessions(gdp)) == [('2000q1', '2000q3', '2000q4')]
+    assert as_tuples(find_recessions(gdp[5:])) == []
+
+
+def test_back_to_back_recessions():
+    gdp = quarterly([5, 4, 3, 4, 5, 4, 3, 4, 5])
+    assert as_tuples(find_recessions(gdp)) == [('2000q1', '2000q3', '2000q4'), ('2001q1', '2001q3', '2001q4')]
+
+
+@pytest.mark.parametrize('values', [[], [5], [5, 4], [5, 4, 3], [5, 4, 3, 4]])
+def test_series_too_short_for_a_recession(values):
+    assert as_tuples(find_recessions(quarterly(values))) == []
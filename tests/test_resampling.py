@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from resampling import _subsets, bootstrap_test, permutation_test
+
+A = [1.0, 2.0, 3.0, 4.0]
+B = [2.0, 4.0, 6.0]
+
+
+@pytest.mark.parametrize('test', [permutation_test, bootstrap_test])
+@pytest.mark.parametrize('resamples', [0, -5])
+def test_resamples_must_be_positive(test, resamples):
+    with pytest.raises(ValueError, match='resamples must be at least 1'):
+        test(A, B, resamples=resamples)
+
+
+@pytest.mark.parametrize('test', [permutation_test, bootstrap_test])
+def test_single_resample(test):
+    result = test(A, B, resamples=1, seed=0)
+    assert result.resamples == 1 and result.statistic == np.mean(A) - np.mean(B)
+    assert 0 < result.pvalue <= 1
+
+
+
+def mean_difference(a, b, axis):
+    return a.mean(axis=axis) - b.mean(axis=axis)
+
+
+@pytest.mark.parametrize('alternative', ['two-sided', 'less', 'greater'])
+@pytest.mark.parametrize('sizes', [(30, 40), (40, 30)])
+def test_permutation_test_matches_scipy(alternative, sizes):
+    rng = np.random.default_rng(sizes[0])
+    a, b = rng.lognormal(0, 1, sizes[0]), rng.lognormal(0.3, 1, sizes[1])
+    result = permutation_test(a, b, 20000, seed=0, alternative=alternative)
+    reference = stats.permutation_test((a, b), mean_difference, n_resamples=20000, vectorized=True,
+                                       alternative=alternative, random_state=0)
+    assert result.statistic == pytest.approx(reference.statistic)
+    assert abs(result.pvalue - reference.pvalue) < 0.02
+
+
+@pytest.mark.parametrize('alternative', ['two-sided', 'less', 'greater'])
+def test_permutation_test_matches_the_exact_test(alternative):
+    # scipy enumerates all 462 splits of 11 values into 5 and 6
+    a, b = np.array([1.0, 2.5, 3.0, 7.0, 8.5]), np.array([0.5, 1.5, 2.0, 2.2, 4.0, 3.5])
+    reference = stats.permutation_test((a, b), mean_difference, vectorized=True, alternative=alternative)
+    assert abs(permutation_test(a, b, 20000, seed=0, alternative=alternative).pvalue - reference.pvalue) < 0.01
+
+
+@pytest.mark.parametrize('alternative', ['two-sided', 'less', 'greater'])
+def test_bootstrap_test_matches_resampling_with_replacement(alternative):
+    rng = np.random.default_rng(1)
+    a, b = rng.lognormal(0, 1, 30), rng.lognormal(0.3, 1, 40)
+    result = bootstrap_test(a, b, 20000, seed=0, alternative=alternative)
+
+    # One resample at a time, from both samples shifted to the pooled mean
+    pooled_mean = np.concatenate([a, b]).mean()
+    shifted_a, shifted_b = a - a.mean() + pooled_mean, b - b.mean() + pooled_mean
+    resampled = np.array([rng.choice(shifted_a, len(a)).mean() - rng.choice(shifted_b, len(b)).mean()
+                          for _ in range(20000)])
+    less = ((resampled <= result.statistic).sum() + 1) / (len(resampled) + 1)
+    greater = ((resampled >= result.statistic).sum() + 1) / (len(resampled) + 1)
+    expected = {'two-sided': min(1.0, 2 * min(less, greater)), 'less': less, 'greater': greater}[alternative]
+    assert abs(result.pvalue - expected) < 0.02
+
+
+@pytest.mark.parametrize('test', [permutation_test, bootstrap_test])
+def test_result_does_not_depend_on_the_workers(test):
+    rng = np.random.default_rng(2)
+    a, b = rng.lognormal(0, 1, 30), rng.lognormal(0.3, 1, 40)
+    assert test(a, b, 5000, seed=3, block_size=700) == test(a, b, 5000, seed=3, block_size=700, workers=2)
+
+
+def test_subsets_are_distinct_and_uniform():
+    rng = np.random.default_rng(0)
+    subsets = _subsets(rng, 5, 2, 50000)
+    assert (subsets[:, 1] > subsets[:, 0]).all()
+    counts = np.unique(subsets[:, 0] * 5 + subsets[:, 1], return_counts=True)[1]
+    assert len(counts) == 10 and np.allclose(counts / len(subsets), 0.1, atol=0.01)
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_regions
+from towns import iter_university_towns, read_university_towns, region_mask, split_by_regions
+
+
+def panel(labels):
+    return pd.MultiIndex.from_tuples(labels, names=['State', 'RegionName'])
+
+
+def regions(labels):
+    return pd.DataFrame(labels, columns=['State', 'RegionName'])
+
+
+def expected_mask(index, towns):
+    wanted = set(towns.itertuples(index=False, name=None))
+    return np.array([label in wanted for label in index], dtype=bool)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_region_mask_matches_label_lookup(seed):
+    index = pd.MultiIndex.from_frame(make_regions(1000, seed))
+    towns = make_regions(100, seed + 1, places=100)
+    np.testing.assert_array_equal(region_mask(index, towns), expected_mask(index, towns))
+
+
+def test_region_mask_duplicates():
+    index = panel([('MI', 'Ann Arbor'), ('MI', 'Ann Arbor'), ('OH', 'Ann Arbor'), ('MI', 'Detroit')])
+    towns = regions([('MI', 'Ann Arbor'), ('MI', 'Ann Arbor')])
+    assert region_mask(index, towns).tolist() == [True, True, False, False]
+
+
+def test_region_mask_missing_towns():
+    # Both labels of ('OH', 'Detroit') are in the panel, but not together
+    index = panel([('MI', 'Ann Arbor'), ('MI', 'Detroit'), ('OH', 'Athens')])
+    towns = regions([('OH', 'Detroit'), ('TX', 'Austin'), ('MI', 'Lansing'), ('MI', 'Detroit')])
+    assert region_mask(index, towns).tolist() == [False, True, False]
+
+
+def test_region_mask_missing_labels():
+    index = panel([('MI', np.nan), ('MI', 'Detroit')])
+    assert region_mask(index, regions([('MI', 'Detroit')])).tolist() == [False, True]
+
+
+def test_region_mask_empty_inputs():
+    index = panel([('MI', 'Ann Arbor')])
+    assert region_mask(index, regions([])).tolist() == [False]
+    assert region_mask(panel([]), regions([('MI', 'Ann Arbor')])).tolist() == []
+
+
+def test_region_mask_accepts_a_multiindex():
+    index = panel([('MI', 'Ann Arbor'), ('MI', 'Detroit')])
+    assert region_mask(index, panel([('MI', 'Detroit')])).tolist() == [False, True]
+
+
+def test_split_by_regions_partitions_the_rows(tmp_path):
+    # As in assignment4.run_ttest: price ratios of a housing panel, towns read from a place list
+    path = tmp_path / 'university_towns.txt'
+    path.write_text('Michigan[edit]\nAnn Arbor (University of Michigan)[1]\nOhio[edit]\nAthens (Ohio University)[2]\n'
+                    'Oxford\n')
+    towns = read_university_towns(path)
+    index = panel([('Ohio', 'Oxford'), ('Michigan', 'Detroit'), ('Michigan', 'Ann Arbor'),
+                   ('Ohio', 'Ann Arbor'), ('Ohio', 'Athens'), ('Ohio', 'Oxford')])
+    ratio = pd.Series([1.0, 2.0, 3.0, np.nan, 5.0, 6.0], index=index)
+
+    unitown, nonunitown = split_by_regions(ratio, towns)
+    assert unitown.index.tolist() == [('Ohio', 'Oxford'), ('Michigan', 'Ann Arbor'), ('Ohio', 'Athens'),
+                                      ('Ohio', 'Oxford')]
+    assert nonunitown.index.tolist() == [('Michigan', 'Detroit'), ('Ohio', 'Ann Arbor')]
+    pd.testing.assert_series_equal(pd.concat([unitown, nonunitown]).sort_index(), ratio.sort_index())
+
+
+def test_iter_university_towns():
+    lines = ['Alabama[edit]\n', 'Auburn (Auburn University)[1]\n', '\n', 'Florence (University of North Alabama)\n',
+             'Alaska[edit]\n', 'Fairbanks\n']
+    assert list(iter_university_towns(lines)) == [('Alabama', 'Auburn'), ('Alabama', 'Florence'),
+                                                  ('Alaska', 'Fairbanks')]
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from benchmarks.synthetic import make_zillow
+from housing import quarterly_means
+from ttests import ratio_ttests
+
+
+@pytest.fixture(scope='module')
+def prices():
+    zillow = make_zillow(300, seed=3, months=[f'{year}-{month:02d}' for year in (2008, 2009) for month in range(1, 13)])
+    months = [column for column in zillow.columns if column[:1].isdigit()]
+    values, quarters = quarterly_means(zillow[months].to_numpy(), months)
+    index = pd.MultiIndex.from_frame(zillow[['State', 'RegionName']])
+    prices = pd.DataFrame(values, index=index, columns=quarters).dropna()
+    # A few states, so that every state has regions in and out of the mask
+    states = np.array(['MI', 'OH', 'TX'])[np.arange(len(prices)) % 3]
+    return prices.set_axis(pd.MultiIndex.from_arrays([states, prices.index.get_level_values(1)],
+                                                     names=['State', 'RegionName']))
+
+
+@pytest.fixture(scope='module')
+def mask(prices):
+    return np.random.default_rng(0).random(len(prices)) < 0.2
+
+
+def assert_matches_ttest_ind(tests, prices, mask, equal_var):
+    for (start, bottom), test in tests.iterrows():
+        ratio = (prices[start] / prices[bottom]).to_numpy()
+        reference = stats.ttest_ind(ratio[mask], ratio[~mask], equal_var=equal_var)
+        np.testing.assert_allclose([test['statistic'], test['df'], test['pvalue']],
+                                   [reference.statistic, reference.df, reference.pvalue], rtol=1e-8)
+        np.testing.assert_allclose([test['mean_in'], test['mean_out']], [ratio[mask].mean(), ratio[~mask].mean()])
+        assert (test['count_in'], test['count_out']) == (mask.sum(), (~mask).sum())
+
+
+@pytest.mark.parametrize('equal_var', [False, True])
+def test_all_pairs_match_ttest_ind(prices, mask, equal_var):
+    tests = ratio_ttests(prices, mask, equal_var=equal_var)
+    assert len(tests) == len(prices.columns) * (len(prices.columns) - 1) // 2
+    assert all(start < bottom for start, bottom in tests.index)
+    assert_matches_ttest_ind(tests, prices, mask, equal_var)
+
+
+@pytest.mark.parametrize('equal_var', [False, True])
+def test_by_state_matches_ttest_ind(prices, mask, equal_var):
+    states = prices.index.get_level_values('State')
+    tests = ratio_ttests(prices, mask, by=states, equal_var=equal_var)
+    assert tests.index.names == ['State', 'start', 'bottom']
+    for state in ['MI', 'OH', 'TX']:
+        rows = np.asarray(states == state)
+        assert_matches_ttest_ind(tests.loc[state], prices[rows], mask[rows], equal_var)
+
+
+def test_given_pairs_match_all_pairs(prices, mask):
+    pairs = [(prices.columns[3], prices.columns[1]), (prices.columns[0], prices.columns[5])]
+    tests = ratio_ttests(prices, mask, pairs=pairs)
+    assert tests.index.tolist() == pairs
+    assert_matches_ttest_ind(tests, prices, mask, False)
@@ -0,0 +1,42 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from benchmarks.synthetic import make_world_bank
+from datasets import add_cache_listener, remove_cache_listener
+from worldbank import read_indicator_panel
+
+YEARS = range(2006, 2016)
+
+
+def test_cached_panel_matches_the_csv(tmp_path):
+    path = tmp_path / 'world_bank.csv'
+    make_world_bank(path, 2)
+    hits = []
+
+    def listener(loader, hit):
+        hits.append((loader.__name__, hit))
+
+    add_cache_listener(listener)
+    try:
+        read, cached = (read_indicator_panel(path, YEARS, cache_dir=tmp_path) for _ in range(2))
+        direct = read_indicator_panel(path, YEARS, cache_dir=None)
+    finally:
+        remove_cache_listener(listener)
+    assert hits == [('read_indicator_panel', False), ('read_indicator_panel', True)]
+    for panel in (read, cached):
+        np.testing.assert_array_equal(panel.values, direct.values)
+        assert panel.countries.equals(direct.countries) and panel.years.equals(direct.years)
+    assert not cached.values.flags.writeable
+    assert sorted(os.path.splitext(name)[1] for name in os.listdir(tmp_path / 'panels')) == ['.json', '.npy']
+
+
+def test_read_indicator_panel_from_concurrent_processes(tmp_path):
+    path = tmp_path / 'world_bank.csv'
+    make_world_bank(path, 2)
+    with ProcessPoolExecutor(4) as pool:
+        panels = list(pool.map(read_indicator_panel, [path] * 8, [YEARS] * 8, [np.float32] * 8,
+                               ['Country Name'] * 8, [tmp_path] * 8))
+    assert all(np.array_equal(panel.values, panels[0].values, equal_nan=True) for panel in panels)
+    assert len(os.listdir(tmp_path / 'panels')) == 2
@@ -0,0 +1,64 @@
+import re
+
+import pandas as pd
+
+"""
+Lookups of places by (State, RegionName), e.g. the university towns in a housing panel, and the
+parser of the hierarchical place lists (university_towns.txt) they come from.
+"""
+
+STATE_SUFFIX = '[edit]'
+# "Ann Arbor (University of Michigan)[2]" -> "Ann Arbor"
+REGION_RE = re.compile(r'[^(]*')
+
+
+def iter_university_towns(lines):
+    """
+    Yields the (State, RegionName) pairs of a place list in the format of university_towns.txt:
+    a "State[edit]" line followed by one line per town in that state. Everything from the
+    first "(" of a town line is dropped.
+    """
+    state = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.endswith(STATE_SUFFIX):
+            state = line[:-len(STATE_SUFFIX)]
+        else:
+            yield state, REGION_RE.match(line).group().rstrip()
+
+
+def read_university_towns(path):
+    """
+    Reads a place list in the format of university_towns.txt into a DataFrame with a categorical
+    State and a RegionName column, sorted by State and RegionName. Towns with the same name in
+    different states are all kept.
+    """
+    state_codes, states, regions = [], {}, []
+    with open(path) as lines:
+        for state, region in iter_university_towns(lines):
+            state_codes.append(states.setdefault(state, len(states)))
+            regions.append(region)
+    state = pd.Categorical.from_codes(state_codes, categories=list(states)).set_categories(sorted(states))
+    df = pd.DataFrame({'State': state, 'RegionName': regions})
+    return df.sort_values(by=['State', 'RegionName'], ignore_index=True)
+
+
+def region_mask(index, regions):
+    """
+    Returns a boolean array telling which entries of the (State, RegionName) MultiIndex index
+    are among regions, a DataFrame with State and RegionName columns (or an equivalent MultiIndex).
+    """
+    if isinstance(regions, pd.DataFrame):
+        regions = pd.MultiIndex.from_frame(regions[['State', 'RegionName']])
+    return index.isin(regions)
+
+
+def split_by_regions(data, regions):
+    """
+    Splits a Series or DataFrame with a (State, RegionName) index into the rows that are among
+    regions and the rest. Select the needed column first to avoid copying a whole frame.
+    """
+    mask = region_mask(data.index, regions)
+    return data[mask], data[~mask]
@@ -0,0 +1,105 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+"""
+Batch two-sample t-tests of price ratios, e.g. university towns against the other regions of the
+housing panel of assignment4, for many (start, bottom) column pairs and region groups at once.
+
+The tests only need the count, sum and sum of squares of the ratios of each group. For all column
+pairs these are matrix products of the prices and their inverses (sum over the rows of
+prices[:, s] / prices[:, t] is (prices.T @ (1 / prices))[s, t]), so thousands of tests cost about
+as much as a few ttest_ind calls.
+"""
+
+TestResult = namedtuple('TestResult', ['statistic', 'df', 'pvalue'])
+
+
+def t_test(mean_a, var_a, count_a, mean_b, var_b, count_b, equal_var=False):
+    """
+    Two-sided two-sample t-test from the means, sample variances (ddof=1) and counts of the groups,
+    elementwise on arrays: Welch's test by default, Student's (pooled variance, as the default of
+    scipy.stats.ttest_ind) with equal_var. Groups with fewer than 2 values give NaN.
+    """
+    from scipy.stats import t  # scipy.stats is slow to import, load it only when a test runs
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if equal_var:
+            df = count_a + count_b - 2.0
+            pooled = ((count_a - 1) * var_a + (count_b - 1) * var_b) / df
+            statistic = (mean_a - mean_b) / np.sqrt(pooled * (1 / count_a + 1 / count_b))
+        else:
+            error_a, error_b = var_a / count_a, var_b / count_b
+            statistic = (mean_a - mean_b) / np.sqrt(error_a + error_b)
+            df = (error_a + error_b) ** 2 / (error_a ** 2 / (count_a - 1) + error_b ** 2 / (count_b - 1))
+    return TestResult(statistic, df, 2 * t.sf(np.abs(statistic), df))
+
+
+def _ratio_moments(prices, starts=None, bottoms=None):
+    # count, sum and sum of squares of prices[:, start] / prices[:, bottom] for every pair
+    inverse = 1 / prices
+    if starts is None:
+        return len(prices), prices.T @ inverse, (prices ** 2).T @ inverse ** 2
+    ratios = prices[:, starts] * inverse[:, bottoms]
+    return len(prices), ratios.sum(axis=0), (ratios ** 2).sum(axis=0)
+
+
+def _mean_var(count, total, squares):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / count
+        return mean, (squares - count * mean ** 2) / (count - 1)
+
+
+def ratio_ttests(prices, mask, pairs=None, by=None, equal_var=False):
+    """
+    Tests the ratios prices[start] / prices[bottom] of the rows in mask against those of the other
+    rows, for every (start, bottom) pair of columns with start before bottom (or the given pairs of
+    column labels), and separately for every group of rows with the same label in by (an array
+    aligned with the rows) if given. Rows with missing prices must be dropped beforehand.
+
+    Returns a DataFrame indexed by (group,) start, bottom with the t statistic, degrees of freedom,
+    p-value, and the mean ratio and number of rows in and out of mask.
+    """
+    values = prices.to_numpy(dtype=np.float64)
+    mask = np.asarray(mask, dtype=bool)
+    columns = prices.columns
+    if pairs is None:
+        starts, bottoms = np.triu_indices(len(columns), k=1)
+    else:
+        starts = np.array([columns.get_loc(start) for start, _ in pairs], dtype=np.intp)
+        bottoms = np.array([columns.get_loc(bottom) for _, bottom in pairs], dtype=np.intp)
+
+    if by is None:
+        codes, groups = np.zeros(len(values), dtype=np.intp), None
+    else:
+        codes, groups = pd.factorize(np.asarray(by), sort=True)
+    order = np.lexsort((~mask, codes))
+    bounds = np.searchsorted(codes[order] * 2 + ~mask[order], np.arange(2 * (codes.max(initial=-1) + 1) + 1))
+
+    moments = []
+    for code in range(len(bounds) // 2):
+        for part in (0, 1):  # in mask, then out of it
+            rows = values[order[bounds[2 * code + part]:bounds[2 * code + part + 1]]]
+            if pairs is None:
+                count, total, squares = _ratio_moments(rows)
+                total, squares = total[starts, bottoms], squares[starts, bottoms]
+            else:
+                count, total, squares = _ratio_moments(rows, starts, bottoms)
+            moments.append((np.full(len(starts), count, dtype=np.float64), total, squares))
+
+    inside = [np.concatenate(part) for part in zip(*moments[0::2])]
+    outside = [np.concatenate(part) for part in zip(*moments[1::2])]
+    mean_in, var_in = _mean_var(*inside)
+    mean_out, var_out = _mean_var(*outside)
+    result = t_test(mean_in, var_in, inside[0], mean_out, var_out, outside[0], equal_var)
+
+    levels = [columns.take(np.tile(starts, len(moments) // 2)), columns.take(np.tile(bottoms, len(moments) // 2))]
+    names = ['start', 'bottom']
+    if groups is not None:
+        levels.insert(0, pd.Index(groups).repeat(len(starts)))
+        names.insert(0, getattr(by, 'name', None) or 'group')
+    return pd.DataFrame({'statistic': result.statistic, 'df': result.df, 'pvalue': result.pvalue,
+                         'mean_in': mean_in, 'mean_out': mean_out,
+                         'count_in': inside[0].astype(np.int64), 'count_out': outside[0].astype(np.int64)},
+                        index=pd.MultiIndex.from_arrays(levels, names=names))
@@ -0,0 +1,151 @@
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+from datasets import CACHE_DIR, cache_entry, code_version, notify_cache, read_cache_file, write_cache_file
+
+"""
+Country x year panels of World Bank indicator files (world_bank.csv): 4 preamble lines, then one
+row per country with its name, code, indicator name and code, and one column per year.
+"""
+
+PREAMBLE_ROWS = 4
+YEAR_RE = re.compile(r'^\d{4}$')
+
+
+class IndicatorPanel:
+    """
+    A country x year matrix of indicator values with lookups by country name and year. The matrix is
+    read-only (and may be memory-mapped), so a panel can be shared between callers.
+    """
+
+    def __init__(self, values, countries, years):
+        self.values = values
+        self.countries = pd.Index(countries)
+        self.years = pd.Index(years, dtype=np.int64, name='year')
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def _rows(self, countries):
+        return slice(None) if countries is None else self.countries.get_indexer(countries)
+
+    def _columns(self, years):
+        if years is None:
+            return slice(None)
+        years = [int(year) for year in years]
+        columns = self.years.get_indexer(years)
+        if (columns < 0).any():
+            raise KeyError(f'years not in the panel: {[year for year, column in zip(years, columns) if column < 0]}')
+        return columns
+
+    def select(self, countries=None, years=None):
+        """
+        Returns the values of the given countries (all by default; NaN for unknown countries) and
+        years (all by default) as a countries x years array.
+        """
+        rows, columns = self._rows(countries), self._columns(years)
+        values = self.values[:, columns]
+        if countries is None:
+            return values
+        selected = values[np.maximum(rows, 0)].astype(np.result_type(values.dtype, np.float32))
+        selected[rows < 0] = np.nan
+        return selected
+
+    def _series(self, values, countries, name):
+        index = self.countries if countries is None else pd.Index(countries)
+        return pd.Series(values, index=index, name=name)
+
+    def mean_over(self, years=None, countries=None, name=None):
+        """
+        Returns the mean of every country's values over the given years (all by default), ignoring
+        missing values, as a float64 Series indexed by countries (all by default).
+        """
+        values = self.select(countries, years)
+        present = ~np.isnan(values)
+        total = np.where(present, values, 0).sum(axis=1, dtype=np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._series(total / present.sum(axis=1), countries, name)
+
+    def change_between(self, start, end, countries=None, name=None):
+        """
+        Returns the change of every country's value from year start to year end, as a float64 Series
+        indexed by countries (all by default).
+        """
+        values = self.select(countries, [start, end]).astype(np.float64)
+        return self._series(values[:, 1] - values[:, 0], countries, name)
+
+    def with_countries(self, countries):
+        """
+        Returns a panel of the same matrix with the rows labelled by countries (e.g. normalized names).
+        """
+        return IndicatorPanel(self.values, countries, self.years)
+
+    def to_frame(self):
+        """
+        Returns the panel as a DataFrame indexed by country with one column per year (as a string,
+        like the columns of the csv file). The DataFrame shares the panel's matrix.
+        """
+        return pd.DataFrame(self.values, index=self.countries, columns=self.years.astype(str).rename(None), copy=False)
+
+
+def _read_csv_panel(path, years, dtype, country_column):
+    header = pd.read_csv(path, skiprows=PREAMBLE_ROWS, nrows=0).columns
+    columns = [column for column in header if YEAR_RE.match(column) and (years is None or int(column) in years)]
+    df = pd.read_csv(path, skiprows=PREAMBLE_ROWS, usecols=[country_column] + columns,
+                     dtype={column: dtype for column in columns})
+    values = np.ascontiguousarray(df[columns].to_numpy(dtype=dtype))
+    return IndicatorPanel(values, pd.Index(df[country_column].to_numpy(dtype=object), name=country_column),
+                          [int(column) for column in columns])
+
+
+def read_indicator_panel(path, years=None, dtype=np.float32, country_column='Country Name', cache_dir=CACHE_DIR):
+    """
+    Reads a World Bank indicator file into an IndicatorPanel. Only the columns of the given years
+    (e.g. range(2006, 2016); all by default) are read, as dtype.
+
+    Unless cache_dir is None, the matrix is saved there as a .npy file (with the labels in a .json
+    file next to it) and later calls memory-map it instead of parsing the csv file, until the hash
+    of the file or of this module changes.
+    """
+    years = None if years is None else {int(year) for year in years}
+    if cache_dir is None:
+        panel = _read_csv_panel(path, years, dtype, country_column)
+        panel.values.setflags(write=False)
+        return panel
+
+    options = (sorted(years) if years is not None else None, np.dtype(dtype).str, country_column)
+    entry = cache_entry('panels', path, options, code_version(read_indicator_panel), cache_dir)
+    # The labels are written first, so once the .npy file exists the panel is complete
+    hit, values = read_cache_file(entry, '.npy', lambda cached: np.load(cached, mmap_mode='r'))
+    if hit:
+        hit, labels = read_cache_file(entry, '.json', _read_json)
+    if hit:
+        notify_cache(read_indicator_panel, True)
+        return IndicatorPanel(values, pd.Index(labels['countries'], dtype=object, name=country_column), labels['years'])
+
+    panel = _read_csv_panel(path, years, dtype, country_column)
+    write_cache_file(entry, '.json', lambda tmp: _write_json(tmp, {'countries': panel.countries.tolist(),
+                                                                   'years': panel.years.tolist()}))
+    write_cache_file(entry, '.npy', lambda tmp: _write_npy(tmp, panel.values))
+    panel.values.setflags(write=False)
+    notify_cache(read_indicator_panel, False)
+    return panel
+
+
+def _read_json(path):
+    with open(path) as labels:
+        return json.load(labels)
+
+
+def _write_json(path, labels):
+    with open(path, 'w') as output:
+        json.dump(labels, output)
+
+
+def _write_npy(path, values):
+    with open(path, 'wb') as output:  # np.save would add .npy to the temporary name
+        np.save(output, values)